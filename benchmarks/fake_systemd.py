@@ -0,0 +1,306 @@
+"""Stand-in for the systemd Manager used by the benchmarks.
+
+Run it on a private bus (``dbus-run-session``) and point the integration at it
+with ``DBUS_SYSTEM_BUS_ADDRESS``. Only the parts of the org.freedesktop.systemd1
+API used by the integration are implemented.
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import random
+import time
+
+from dbus_next import BusType, Message, MessageType, Variant
+from dbus_next.aio import MessageBus
+
+BUS_NAME = "org.freedesktop.systemd1"
+OBJECT_PATH = "/org/freedesktop/systemd1"
+UNIT_PATH = "/org/freedesktop/systemd1/unit/"
+JOB_PATH = "/org/freedesktop/systemd1/job/"
+MANAGER_INTERFACE = "org.freedesktop.systemd1.Manager"
+UNIT_INTERFACE = "org.freedesktop.systemd1.Unit"
+SERVICE_INTERFACE = "org.freedesktop.systemd1.Service"
+TIMER_INTERFACE = "org.freedesktop.systemd1.Timer"
+PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
+INTROSPECTABLE_INTERFACE = "org.freedesktop.DBus.Introspectable"
+BENCH_INTERFACE = "io.github.systemd_manager.Bench"
+
+MANAGER_XML = """<node>
+ <interface name="org.freedesktop.systemd1.Manager">
+  <method name="ListUnits"><arg type="a(ssssssouso)" direction="out"/></method>
+  <method name="ListUnitsByNames"><arg type="as" direction="in"/><arg type="a(ssssssouso)" direction="out"/></method>
+  <method name="ListUnitsByPatterns"><arg type="as" direction="in"/><arg type="as" direction="in"/><arg type="a(ssssssouso)" direction="out"/></method>
+  <method name="LoadUnit"><arg type="s" direction="in"/><arg type="o" direction="out"/></method>
+  <method name="GetUnit"><arg type="s" direction="in"/><arg type="o" direction="out"/></method>
+  <method name="ListUnitFiles"><arg type="a(ss)" direction="out"/></method>
+  <method name="ListUnitFilesByPatterns"><arg type="as" direction="in"/><arg type="as" direction="in"/><arg type="a(ss)" direction="out"/></method>
+  <method name="GetUnitFileState"><arg type="s" direction="in"/><arg type="s" direction="out"/></method>
+  <method name="StartUnit"><arg type="s" direction="in"/><arg type="s" direction="in"/><arg type="o" direction="out"/></method>
+  <method name="StopUnit"><arg type="s" direction="in"/><arg type="s" direction="in"/><arg type="o" direction="out"/></method>
+  <method name="RestartUnit"><arg type="s" direction="in"/><arg type="s" direction="in"/><arg type="o" direction="out"/></method>
+  <method name="StartTransientUnit"><arg type="s" direction="in"/><arg type="s" direction="in"/><arg type="a(sv)" direction="in"/><arg type="a(sa(sv))" direction="in"/><arg type="o" direction="out"/></method>
+  <method name="ResetFailedUnit"><arg type="s" direction="in"/></method>
+  <method name="EnableUnitFiles"><arg type="as" direction="in"/><arg type="b" direction="in"/><arg type="b" direction="in"/><arg type="b" direction="out"/><arg type="a(sss)" direction="out"/></method>
+  <method name="DisableUnitFiles"><arg type="as" direction="in"/><arg type="b" direction="in"/><arg type="a(sss)" direction="out"/></method>
+  <method name="Subscribe"/>
+  <method name="Unsubscribe"/>
+ </interface>
+</node>"""
+
+
+def escape(unit_name: str) -> str:
+    return "".join(char if char.isalnum() else "_{:02x}".format(ord(char)) for char in unit_name)
+
+
+class Fault(Exception):
+    def __init__(self, name: str, text: str) -> None:
+        super().__init__(text)
+        self.name = name
+        self.text = text
+
+
+class Unit(object):
+    def __init__(self, name: str, running: bool) -> None:
+        self.name = name
+        self.path = UNIT_PATH + escape(name)
+        self.enabled = True
+        self.set_running(running)
+
+    def set_running(self, running: bool) -> None:
+        self.active_state = "active" if running else "inactive"
+        self.sub_state = "running" if running else "dead"
+        self.timestamp = int(time.time() * 1000000)
+
+    def row(self) -> list:
+        return [self.name, "Benchmark unit", "loaded", self.active_state, self.sub_state, "", self.path, 0, "", "/"]
+
+    def properties(self, interface: str) -> dict:
+        if interface == UNIT_INTERFACE:
+            return {
+                "Id": Variant("s", self.name),
+                "LoadState": Variant("s", "loaded"),
+                "ActiveState": Variant("s", self.active_state),
+                "SubState": Variant("s", self.sub_state),
+                "StateChangeTimestamp": Variant("t", self.timestamp),
+                "TriggeredBy": Variant("as", []),
+            }
+
+        if interface == SERVICE_INTERFACE and self.name.endswith(".service"):
+            return {
+                "Type": Variant("s", "simple"),
+                "Result": Variant("s", "success"),
+                "ExecMainStatus": Variant("i", 0),
+                "ControlGroup": Variant("s", "/system.slice/" + self.name),
+                "CPUUsageNSec": Variant("t", int(time.monotonic() * 1000000)),
+                "MemoryCurrent": Variant("t", 4194304),
+                "TasksCurrent": Variant("t", 1),
+                "IOReadBytes": Variant("t", 0),
+                "IOWriteBytes": Variant("t", 0),
+            }
+
+        if interface == TIMER_INTERFACE and self.name.endswith(".timer"):
+            return {
+                "Unit": Variant("s", self.name[:-len(".timer")] + ".service"),
+                "NextElapseUSecRealtime": Variant("t", self.timestamp + 3600000000),
+                "LastTriggerUSec": Variant("t", self.timestamp),
+                "Result": Variant("s", "success"),
+            }
+
+        return {}
+
+
+class FakeSystemd(object):
+    def __init__(self, bus: MessageBus, units: int, running: float, timers: float = 0.0) -> None:
+        self.bus = bus
+        self.units = {}
+        self.paths = {}
+        self.stats = {}
+        self.job_id = 0
+
+        for index in range(units):
+            unit = Unit("bench-{:05d}.service".format(index), random.random() < running)
+            self.units[unit.name] = unit
+            self.paths[unit.path] = unit
+
+        for index in range(int(units * timers)):
+            unit = Unit("bench-{:05d}.timer".format(index), random.random() < running)
+            self.units[unit.name] = unit
+            self.paths[unit.path] = unit
+
+    def handle(self, message: Message):
+        if message.message_type != MessageType.METHOD_CALL or message.destination != BUS_NAME:
+            return None
+
+        key = "{}.{}".format(message.interface, message.member)
+        self.stats[key] = self.stats.get(key, 0) + 1
+
+        handler = getattr(self, "_" + message.member, None)
+        if handler is None:
+            return Message.new_error(message, "org.freedesktop.DBus.Error.UnknownMethod", key)
+
+        try:
+            signature, body = handler(message, *message.body)
+        except KeyError as e:
+            return Message.new_error(message, "org.freedesktop.systemd1.NoSuchUnit", str(e))
+        except Fault as e:
+            return Message.new_error(message, e.name, e.text)
+
+        return Message.new_method_return(message, signature, body)
+
+    def _Introspect(self, message: Message):
+        return "s", [MANAGER_XML if message.path == OBJECT_PATH else "<node/>"]
+
+    def _ListUnits(self, message: Message):
+        return "a(ssssssouso)", [[unit.row() for unit in self.units.values()]]
+
+    def _ListUnitsByNames(self, message: Message, names: list):
+        return "a(ssssssouso)", [[self.units[name].row() for name in names if name in self.units]]
+
+    def _ListUnitsByPatterns(self, message: Message, states: list, patterns: list):
+        return "a(ssssssouso)", [[
+            unit.row() for unit in self.units.values()
+            if any(fnmatch.fnmatchcase(unit.name, pattern) for pattern in patterns)
+        ]]
+
+    def _LoadUnit(self, message: Message, name: str):
+        return "o", [self.units[name].path]
+
+    def _GetUnit(self, message: Message, name: str):
+        return "o", [self.units[name].path]
+
+    def _ListUnitFiles(self, message: Message):
+        return "a(ss)", [[
+            ["/etc/systemd/system/" + unit.name, "enabled" if unit.enabled else "disabled"] for unit in self.units.values()
+        ]]
+
+    def _ListUnitFilesByPatterns(self, message: Message, states: list, patterns: list):
+        return "a(ss)", [[
+            ["/etc/systemd/system/" + unit.name, "enabled" if unit.enabled else "disabled"] for unit in self.units.values()
+            if any(fnmatch.fnmatchcase(unit.name, pattern) for pattern in patterns)
+        ]]
+
+    def _GetUnitFileState(self, message: Message, name: str):
+        return "s", ["enabled" if self.units[name].enabled else "disabled"]
+
+    def _StartUnit(self, message: Message, name: str, mode: str):
+        return "o", [self._queue_job(self.units[name], True)]
+
+    def _StopUnit(self, message: Message, name: str, mode: str):
+        return "o", [self._queue_job(self.units[name], False)]
+
+    def _RestartUnit(self, message: Message, name: str, mode: str):
+        return "o", [self._queue_job(self.units[name], True)]
+
+    def _StartTransientUnit(self, message: Message, name: str, mode: str, properties: list, aux: list):
+        if name in self.units:
+            raise Fault("org.freedesktop.systemd1.UnitExists", name)
+
+        unit = Unit(name, False)
+        self.units[unit.name] = unit
+        self.paths[unit.path] = unit
+
+        return "o", [self._queue_job(unit, True)]
+
+    def _ResetFailedUnit(self, message: Message, name: str):
+        self.units[name]
+
+        return "", []
+
+    def _EnableUnitFiles(self, message: Message, names: list, runtime: bool, force: bool):
+        for name in names:
+            self.units[name].enabled = True
+
+        return "ba(sss)", [False, []]
+
+    def _DisableUnitFiles(self, message: Message, names: list, runtime: bool):
+        for name in names:
+            self.units[name].enabled = False
+
+        return "a(sss)", [[]]
+
+    def _Subscribe(self, message: Message):
+        return "", []
+
+    def _Unsubscribe(self, message: Message):
+        return "", []
+
+    def _GetAll(self, message: Message, interface: str):
+        return "a{sv}", [self.paths[message.path].properties(interface)]
+
+    def _Get(self, message: Message, interface: str, name: str):
+        properties = self.paths[message.path].properties(interface)
+        if name not in properties:
+            raise Fault("org.freedesktop.DBus.Error.UnknownProperty", name)
+
+        return "v", [properties[name]]
+
+    def _GetStats(self, message: Message):
+        return "a{su}", [self.stats]
+
+    def _ResetStats(self, message: Message):
+        self.stats = {}
+
+        return "", []
+
+    def _queue_job(self, unit: Unit, running: bool) -> str:
+        self.job_id += 1
+
+        job_id = self.job_id
+        job_path = JOB_PATH + str(job_id)
+
+        def finish() -> None:
+            self.set_running(unit, running)
+            self.bus.send(Message.new_signal(
+                OBJECT_PATH, MANAGER_INTERFACE, "JobRemoved", "uoss", [job_id, job_path, unit.name, "done"]
+            ))
+
+        asyncio.get_running_loop().call_later(0.05, finish)
+
+        return job_path
+
+    def set_running(self, unit: Unit, running: bool) -> None:
+        unit.set_running(running)
+
+        self.bus.send(Message.new_signal(
+            unit.path, PROPERTIES_INTERFACE, "PropertiesChanged", "sa{sv}as", [
+                UNIT_INTERFACE,
+                {key: value for key, value in unit.properties(UNIT_INTERFACE).items() if key in ["ActiveState", "SubState"]},
+                []
+            ]
+        ))
+
+    async def churn(self, rate: float) -> None:
+        units = list(self.units.values())
+
+        while True:
+            await asyncio.sleep(1)
+
+            for unit in random.sample(units, int(len(units) * rate)):
+                self.set_running(unit, unit.sub_state != "running")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument("--units", type = int, default = 1000)
+    parser.add_argument("--running", type = float, default = 0.5, help = "share of running units")
+    parser.add_argument("--churn", type = float, default = 0.0, help = "share of units toggled every second")
+    parser.add_argument("--timers", type = float, default = 0.0, help = "share of timer units added next to the services")
+    args = parser.parse_args()
+
+    bus = await MessageBus(bus_type = BusType.SESSION).connect()
+    systemd = FakeSystemd(bus, args.units, args.running, args.timers)
+
+    bus.add_message_handler(systemd.handle)
+    await bus.request_name(BUS_NAME)
+
+    print("ready", flush = True)
+
+    if args.churn > 0:
+        asyncio.get_running_loop().create_task(systemd.churn(args.churn))
+
+    await bus.wait_for_disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,216 @@
+"""Benchmarks for the Systemd Manager integration.
+
+Starts benchmarks/fake_systemd.py on a private bus for every unit count and
+measures the Manager backends and a full Worker refresh against it. The runner
+re-executes itself under dbus-run-session with benchmarks/bus.conf, which
+applies the system bus limits (128 pending replies per connection):
+
+    python benchmarks/run.py --units 100 1000 10000
+
+Requires the integration requirements and homeassistant to be installed.
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUS_CONFIG = os.path.join(ROOT, "benchmarks", "bus.conf")
+BUS_MARKER = "SYSTEMD_MANAGER_BENCHMARK_BUS"
+
+sys.path.insert(0, ROOT)
+
+from dbus_next import BusType, Message, MessageType  # noqa: E402
+from dbus_next.aio import MessageBus  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.systemd_manager.core.const import (  # noqa: E402
+    DOMAIN,
+    CONF_SERVICES_LIST,
+    CONF_BACKEND,
+    BACKENDS,
+)
+from custom_components.systemd_manager.core.backend import async_create_manager  # noqa: E402
+from custom_components.systemd_manager.core.units import get_unit_type  # noqa: E402
+from custom_components.systemd_manager.core.worker import Worker  # noqa: E402
+
+
+def percentile(values: list, percent: float) -> float:
+    values = sorted(values)
+
+    return values[min(int(len(values) * percent / 100), len(values) - 1)]
+
+
+class LoopProbe(object):
+    def __init__(self, interval: float = 0.001) -> None:
+        self._interval = interval
+        self._task = None
+        self.lags = []
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self._interval)
+            self.lags.append(time.perf_counter() - started - self._interval)
+
+    def __enter__(self):
+        self.lags = []
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._task.cancel()
+
+
+class Stats(object):
+    def __init__(self, bus: MessageBus) -> None:
+        self._bus = bus
+
+    async def _call(self, member: str) -> list:
+        reply = await self._bus.call(Message(
+            destination = "org.freedesktop.systemd1",
+            path = "/org/freedesktop/systemd1",
+            interface = "io.github.systemd_manager.Bench",
+            member = member
+        ))
+
+        assert reply.message_type == MessageType.METHOD_RETURN, reply.body
+
+        return reply.body
+
+    async def reset(self) -> None:
+        await self._call("ResetStats")
+
+    async def calls(self) -> dict:
+        stats = (await self._call("GetStats"))[0]
+
+        return {name.rsplit(".", 1)[-1]: count for name, count in stats.items() if not name.startswith("io.github")}
+
+
+async def measure(name: str, rounds: int, stats: Stats, function) -> None:
+    timings = []
+
+    await stats.reset()
+
+    with LoopProbe() as probe:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            await function()
+            timings.append(time.perf_counter() - started)
+
+        await asyncio.sleep(0)
+
+    calls = await stats.calls()
+
+    print("  {:<36} p50 {:>9.2f} ms  p95 {:>9.2f} ms  p99 {:>9.2f} ms  calls/op {:>8.1f}  loop lag max {:>8.2f} ms".format(
+        name,
+        percentile(timings, 50) * 1000,
+        percentile(timings, 95) * 1000,
+        percentile(timings, 99) * 1000,
+        sum(calls.values()) / rounds,
+        max(probe.lags or [0]) * 1000,
+    ))
+    print("  {:<36} {}".format("", "  ".join(
+        "{} {:.1f}".format(member, count / rounds) for member, count in sorted(calls.items())
+    )))
+
+
+async def create_hass(config_dir: str) -> HomeAssistant:
+    try:
+        hass = HomeAssistant(config_dir)
+    except TypeError:
+        hass = HomeAssistant()
+        hass.config.config_dir = config_dir
+
+    return hass
+
+
+async def run(args, units: int) -> None:
+    selected = ["bench-{:05d}.service".format(index) for index in range(0, units, max(int(1 / args.selected), 1))]
+
+    request = get_unit_type(selected[0]).request
+
+    print("units {} selected {} churn {}".format(units, len(selected), args.churn))
+
+    hass = await create_hass(tempfile.mkdtemp())
+    bus = await MessageBus(bus_type = BusType.SESSION).connect()
+    stats = Stats(bus)
+
+    for backend in BACKENDS:
+        try:
+            manager = await async_create_manager(hass, backend)
+        except ImportError as e:
+            print("  {} skipped: {}".format(backend, e))
+
+            continue
+
+        await measure("{} list".format(backend), args.rounds, stats, manager.async_list)
+        await measure(
+            "{} list selected".format(backend), args.rounds, stats, lambda: manager.async_list(selected)
+        )
+        await measure(
+            "{} properties selected".format(backend),
+            args.rounds,
+            stats,
+            lambda: manager.async_get_units_properties(selected, request)
+        )
+
+        await manager.async_close()
+
+        entry = SimpleNamespace(
+            entry_id = backend, title = "bench", options = {CONF_SERVICES_LIST: selected, CONF_BACKEND: backend}
+        )
+
+        worker = Worker(hass, entry)
+        hass.data.setdefault(DOMAIN, {})[entry.entry_id] = worker
+
+        await worker.async_connect()
+        await worker.async_update()
+        await measure("{} worker update".format(backend), args.rounds, stats, worker.async_update)
+
+        hass.data[DOMAIN].pop(entry.entry_id)
+        await worker.async_unload()
+
+    bus.disconnect()
+    await hass.async_stop(force = True)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--units", type = int, nargs = "+", default = [100, 1000, 10000])
+    parser.add_argument("--selected", type = float, default = 0.1, help = "share of units selected in the integration")
+    parser.add_argument("--churn", type = float, default = 0.01, help = "share of units toggled every second")
+    parser.add_argument("--rounds", type = int, default = 20)
+    args = parser.parse_args()
+
+    os.environ["DBUS_SYSTEM_BUS_ADDRESS"] = os.environ["DBUS_SESSION_BUS_ADDRESS"]
+
+    for units in args.units:
+        systemd = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "benchmarks", "fake_systemd.py"), "--units", str(units), "--churn", str(args.churn)],
+            stdout = subprocess.PIPE,
+            text = True
+        )
+
+        try:
+            systemd.stdout.readline()
+
+            await run(args, units)
+        finally:
+            systemd.terminate()
+            systemd.wait()
+
+
+if __name__ == "__main__":
+    if os.environ.get(BUS_MARKER) != BUS_CONFIG:
+        os.environ[BUS_MARKER] = BUS_CONFIG
+        os.execvp("dbus-run-session", ["dbus-run-session", "--config-file", BUS_CONFIG, "--", sys.executable] + sys.argv)
+
+    asyncio.run(main())
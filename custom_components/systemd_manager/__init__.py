@@ -1,25 +1,67 @@
 import logging
+import asyncio
+import platform
 
-from homeassistant.core import HomeAssistant, ServiceCall
+import voluptuous as vol
+import homeassistant.helpers.config_validation as cv
+
+from typing import Optional
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
 from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
+from homeassistant.exceptions import ConfigEntryNotReady, Unauthorized, UnknownUser
+
+import homeassistant.helpers.entity_registry as er
 
 from .core.const import (
     DOMAIN,
+    PLATFORMS,
+    CONF_ADDRESS,
     CONF_MODE,
+    CONF_CONCURRENCY,
+    CONF_WAIT,
+    CONF_TIMEOUT,
+    CONF_ACTION,
+    CONF_COMMAND,
+    CONF_HOST,
+    CONF_CPU_QUOTA,
+    CONF_MEMORY_MAX,
+    CONF_RUNTIME_MAX,
+    CONF_LINES,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_JOB_TIMEOUT,
+    DEFAULT_RUN_TIMEOUT,
+    MAX_JOURNAL_SIZE,
+    EVENT_ACTION_RESULT,
     SERVICE_START,
     SERVICE_STOP,
     SERVICE_RESTART,
     SERVICE_ENABLE,
     SERVICE_DISABLE,
+    SERVICE_CASCADE,
+    SERVICE_IMPACT,
+    SERVICE_RUN,
     ATTR_UNIT_NAME
 )
 from .core.worker import Worker
-from .core.manager import Mode
+from .core.base import Mode
+from .websocket import async_setup_websocket
 
 _LOGGER = logging.getLogger(__name__)
 
+RUN_SCHEMA = vol.Schema({
+    vol.Required(CONF_COMMAND): vol.Any(cv.string, vol.All(cv.ensure_list, [cv.string], vol.Length(min = 1))),
+    vol.Optional(CONF_HOST): cv.string,
+    vol.Optional(CONF_CPU_QUOTA): vol.All(vol.Coerce(float), vol.Range(min = 1)),
+    vol.Optional(CONF_MEMORY_MAX): vol.All(vol.Coerce(int), vol.Range(min = 1)),
+    vol.Optional(CONF_RUNTIME_MAX): vol.All(vol.Coerce(float), vol.Range(min = 1)),
+    vol.Optional(CONF_TIMEOUT, default = DEFAULT_RUN_TIMEOUT): vol.All(vol.Coerce(float), vol.Range(min = 1)),
+    vol.Optional(CONF_LINES): vol.All(vol.Coerce(int), vol.Range(min = 1, max = MAX_JOURNAL_SIZE)),
+})
+
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     await async_init_services(hass)
+    async_setup_websocket(hass)
 
     if DOMAIN not in config:
         return True
@@ -39,15 +81,36 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
     if config_entry.data:
         hass.config_entries.async_update_entry(config_entry, data = {} , options = config_entry.data)
 
+    if config_entry.unique_id is None:
+        unique_id = config_entry.options.get(CONF_ADDRESS) or platform.node()
+
+        if not any(entry.unique_id == unique_id for entry in hass.config_entries.async_entries(DOMAIN)):
+            hass.config_entries.async_update_entry(config_entry, unique_id = unique_id)
+
     worker = Worker(hass, config_entry)
 
-    hass.data.setdefault(DOMAIN, worker)
+    try:
+        await worker.async_connect()
+    except ConnectionError as e:
+        raise ConfigEntryNotReady(str(e)) from e
+
+    hass.data.setdefault(DOMAIN, {})[config_entry.entry_id] = worker
 
     if not await worker.async_setup():
         return False
 
     return True
 
+async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
+    if not await hass.config_entries.async_unload_platforms(config_entry, PLATFORMS):
+        return False
+
+    worker = hass.data[DOMAIN].pop(config_entry.entry_id)
+
+    await worker.async_unload()
+
+    return True
+
 async def async_init_services(hass: HomeAssistant) -> None:
     async def service_start(service_call: ServiceCall) -> None:
         await async_call_action(hass, SERVICE_START, dict(service_call.data))
@@ -64,47 +127,211 @@ async def async_init_services(hass: HomeAssistant) -> None:
     async def service_disable(service_call: ServiceCall) -> None:
         await async_call_action(hass, SERVICE_DISABLE, dict(service_call.data))
 
+    async def service_cascade(service_call: ServiceCall) -> None:
+        await async_call_cascade(hass, dict(service_call.data))
+
+    async def service_impact(service_call: ServiceCall) -> ServiceResponse:
+        return await async_get_impact(hass, dict(service_call.data))
+
+    async def service_run(service_call: ServiceCall) -> ServiceResponse:
+        await async_check_admin(hass, service_call)
+
+        return await async_run_command(hass, dict(service_call.data))
+
     hass.services.async_register(DOMAIN, SERVICE_START, service_start)
     hass.services.async_register(DOMAIN, SERVICE_STOP, service_stop)
     hass.services.async_register(DOMAIN, SERVICE_RESTART, service_restart)
     hass.services.async_register(DOMAIN, SERVICE_ENABLE, service_enable)
     hass.services.async_register(DOMAIN, SERVICE_DISABLE, service_disable)
+    hass.services.async_register(DOMAIN, SERVICE_CASCADE, service_cascade)
+    hass.services.async_register(DOMAIN, SERVICE_IMPACT, service_impact, supports_response = SupportsResponse.ONLY)
+    hass.services.async_register(
+        DOMAIN, SERVICE_RUN, service_run, schema = RUN_SCHEMA, supports_response = SupportsResponse.OPTIONAL
+    )
 
-async def async_call_action(hass: HomeAssistant, action: str, data: dict) -> None:
-    entities = data.pop('entity_id', None)
+async def async_check_admin(hass: HomeAssistant, service_call: ServiceCall) -> None:
+    if not service_call.context.user_id:
+        return
+
+    user = await hass.auth.async_get_user(service_call.context.user_id)
+
+    if user is None:
+        raise UnknownUser(context = service_call.context, permission = "admin", user_id = service_call.context.user_id)
+
+    if not user.is_admin:
+        raise Unauthorized(context = service_call.context, permission = "admin", user_id = user.id)
+
+def _get_worker(hass: HomeAssistant, host: Optional[str] = None) -> Optional[Worker]:
+    workers = list(hass.data.get(DOMAIN, {}).values())
 
+    if host:
+        return next((worker for worker in workers if worker.host == host), None)
+
+    return next((worker for worker in workers if not worker.address), workers[0] if workers else None)
+
+def _get_units(hass: HomeAssistant, entities) -> dict:
     if not entities:
-        return
+        return {}
 
-    mode = data.pop(CONF_MODE, None)
-    if mode:
-        mode = Mode[mode]
+    if isinstance(entities, str):
+        entities = [entities]
 
-    manager = hass.data[DOMAIN].manager
+    registry = er.async_get(hass)
 
+    units = {}
     for entity_id in entities:
         state = hass.states.get(entity_id)
-        if not state:
+        entry = registry.async_get(entity_id)
+        if not state or not entry or entry.config_entry_id not in hass.data.get(DOMAIN, {}):
             continue
 
-        unit_name = state.attributes[ATTR_UNIT_NAME]
+        units.setdefault(entry.config_entry_id, []).append(state.attributes[ATTR_UNIT_NAME])
+
+    return units
+
+async def async_call_action(hass: HomeAssistant, action: str, data: dict) -> None:
+    units = _get_units(hass, data.pop('entity_id', None))
+
+    if not units:
+        return
+
+    mode = data.pop(CONF_MODE, None)
+    mode = Mode[mode] if mode else Mode.REPLACE
+
+    concurrency = max(int(data.pop(CONF_CONCURRENCY, DEFAULT_CONCURRENCY)), 1)
+    wait = bool(data.pop(CONF_WAIT, False))
+    timeout = float(data.pop(CONF_TIMEOUT, DEFAULT_JOB_TIMEOUT))
+
+    await asyncio.gather(*[
+        async_call_worker_action(
+            hass, hass.data[DOMAIN][entry_id], action, unit_names, mode, concurrency, wait, timeout
+        )
+        for entry_id, unit_names in units.items()
+    ])
+
+async def async_call_worker_action(
+    hass: HomeAssistant,
+    worker: Worker,
+    action: str,
+    unit_names: list,
+    mode: Mode,
+    concurrency: int,
+    wait: bool,
+    timeout: float
+) -> None:
+    manager = worker.manager
+
+    job_results = {}
+
+    if action in [SERVICE_ENABLE, SERVICE_DISABLE]:
+        method = manager.async_enable if action == SERVICE_ENABLE else manager.async_disable
+        result = await method(unit_names)
+
+        results = {unit_name: result for unit_name in unit_names}
+
+        if not worker.is_subscribed:
+            await worker.async_refresh_unit_files(True)
+    else:
+        method = {
+            SERVICE_START: manager.async_start,
+            SERVICE_STOP: manager.async_stop,
+            SERVICE_RESTART: manager.async_restart,
+        }[action]
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def async_run(unit_name: str) -> Optional[str]:
+            async with semaphore:
+                return await method(unit_name, mode)
+
+        jobs = dict(zip(unit_names, await asyncio.gather(*[async_run(unit_name) for unit_name in unit_names])))
+        results = {unit_name: job is not None for unit_name, job in jobs.items()}
+
+        if wait:
+            job_results = await asyncio.gather(*[
+                worker.async_wait_job(job, timeout, unit_name, action != SERVICE_STOP) for unit_name, job in jobs.items()
+            ])
+
+            job_results = dict(zip(jobs.keys(), job_results))
+            results = {unit_name: job_results[unit_name] == "done" for unit_name in results}
+
+    worker.boost()
+
+    hass.bus.async_fire(EVENT_ACTION_RESULT, {
+        "host": worker.host,
+        "action": action,
+        "results": results,
+        "jobs": job_results,
+        "success": [unit_name for unit_name, result in results.items() if result],
+        "failed": [unit_name for unit_name, result in results.items() if not result],
+    })
+
+async def async_call_cascade(hass: HomeAssistant, data: dict) -> None:
+    action = data.pop(CONF_ACTION, SERVICE_RESTART)
+    mode = data.pop(CONF_MODE, None)
+    mode = Mode[mode] if mode else Mode.REPLACE
+
+    concurrency = max(int(data.pop(CONF_CONCURRENCY, DEFAULT_CONCURRENCY)), 1)
+    timeout = float(data.pop(CONF_TIMEOUT, DEFAULT_JOB_TIMEOUT))
+
+    for entry_id, unit_names in _get_units(hass, data.pop('entity_id', None)).items():
+        worker = hass.data[DOMAIN][entry_id]
+
+        for unit_name in unit_names:
+            cascade = await worker.async_cascade(action, unit_name, mode, concurrency, timeout)
+
+            hass.bus.async_fire(EVENT_ACTION_RESULT, {
+                "host": worker.host,
+                "action": action,
+                "cascade": unit_name,
+                "levels": cascade["levels"],
+                "results": cascade["results"],
+                "jobs": cascade["jobs"],
+                "success": [name for name, result in cascade["results"].items() if result],
+                "failed": [name for name, result in cascade["results"].items() if not result],
+            })
+
+async def async_get_impact(hass: HomeAssistant, data: dict) -> dict:
+    impact = {}
+
+    for entry_id, unit_names in _get_units(hass, data.get('entity_id')).items():
+        graph = await hass.data[DOMAIN][entry_id].async_ensure_graph()
+
+        for unit_name in unit_names:
+            units = graph.impact(unit_name)
+
+            impact[unit_name] = {
+                "impact": units,
+                "levels": graph.levels([unit_name] + units),
+                "dependencies": graph.get(unit_name),
+            }
+
+    return impact
+
+async def async_run_command(hass: HomeAssistant, data: dict) -> dict:
+    worker = _get_worker(hass, data.get(CONF_HOST))
 
-        if action == SERVICE_START:
-            manager.start(unit_name, mode)
-            return
+    if worker is None:
+        _LOGGER.error('Systemd Manager: no host to run the command on')
 
-        if action == SERVICE_STOP:
-            manager.stop(unit_name, mode)
-            return
+        return {}
 
-        if action == SERVICE_RESTART:
-            manager.restart(unit_name, mode)
-            return
+    run = await worker.async_run(
+        data[CONF_COMMAND],
+        data.get(CONF_CPU_QUOTA),
+        data.get(CONF_MEMORY_MAX),
+        data.get(CONF_RUNTIME_MAX),
+        data[CONF_TIMEOUT],
+        data.get(CONF_LINES)
+    )
 
-        if action == SERVICE_ENABLE:
-            manager.enable(unit_name)
-            return
+    hass.bus.async_fire(EVENT_ACTION_RESULT, {
+        "host": worker.host,
+        "action": SERVICE_RUN,
+        "unit": run["unit"],
+        "job": run["job"],
+        "result": run["result"],
+        "exit_status": run["exit_status"],
+    })
 
-        if action == SERVICE_DISABLE:
-            manager.disable(unit_name)
-            return
\ No newline at end of file
+    return run
@@ -0,0 +1,115 @@
+import logging
+
+from typing import Optional
+
+import homeassistant.helpers.entity_registry as er
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import slugify
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntity
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .core.const import DOMAIN, DATA_UPDATED, HISTORY_UPDATED, HISTORY_TICK, ATTR_RESTARTS, ATTR_FLAPPING
+from .core.service import Service
+from .core.worker import Worker
+
+_LOGGER = logging.getLogger(__name__)
+
+async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities) -> None:
+    worker = hass.data[DOMAIN][config_entry.entry_id]
+
+    entities = {}
+
+    @callback
+    def update_services() -> None:
+        registry = er.async_get(hass)
+
+        for name in [name for name in entities if not worker.history_sensors or not worker.services.has(name)]:
+            entity = entities.pop(name)
+
+            if registry.async_get(entity.entity_id) is not None:
+                registry.async_remove(entity.entity_id)
+            else:
+                hass.async_create_task(entity.async_remove())
+
+        if not worker.history_sensors:
+            return
+
+        new_entities = []
+        for name, service in worker.services.list.items():
+            if name in entities:
+                continue
+
+            entities[name] = SystemdFlappingSensor(hass, worker, service)
+            new_entities.append(entities[name])
+
+        if len(new_entities) > 0:
+            async_add_entities(new_entities)
+
+    config_entry.async_on_unload(async_dispatcher_connect(
+        hass, DATA_UPDATED.format(config_entry.entry_id), update_services
+    ))
+
+    update_services()
+
+class SystemdFlappingSensor(BinarySensorEntity):
+    def __init__(self, hass: HomeAssistant, worker: Worker, service: Service) -> None:
+        self.hass = hass
+        self.worker = worker
+        self.service = service
+
+        self._unique_id = "systemd_manager_{}".format(slugify(
+            "{} {}".format(service.name, ATTR_FLAPPING)
+            if not worker.address else "{} {} {}".format(worker.host, service.name, ATTR_FLAPPING)
+        ))
+        self._stats = {}
+
+        self.entity_id = "binary_sensor.{}".format(self._unique_id)
+
+    @property
+    def name(self) -> str:
+        return "{} Flapping".format(self.service.name)
+
+    @property
+    def unique_id(self) -> str:
+        return self._unique_id
+
+    @property
+    def device_class(self) -> str:
+        return BinarySensorDeviceClass.PROBLEM
+
+    @property
+    def is_on(self) -> bool:
+        return bool(self._stats.get(ATTR_FLAPPING))
+
+    @property
+    def extra_state_attributes(self) -> Optional[dict]:
+        return {ATTR_RESTARTS: self._stats.get(ATTR_RESTARTS)}
+
+    @property
+    def should_poll(self) -> bool:
+        return False
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass, HISTORY_UPDATED.format(self.worker.config_entry.entry_id, self.service.name), self._update
+        ))
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass, HISTORY_TICK.format(self.worker.config_entry.entry_id), self._update
+        ))
+
+        self._stats = self._get_stats()
+
+    def _get_stats(self) -> dict:
+        stats = self.worker.history.stats(self.service.name, self.service.unit_type.on_states)
+
+        return {key: stats.get(key) for key in [ATTR_FLAPPING, ATTR_RESTARTS]}
+
+    @callback
+    def _update(self) -> None:
+        stats = self._get_stats()
+
+        if stats != self._stats:
+            self._stats = stats
+            self.async_write_ha_state()
@@ -1,40 +1,100 @@
 import logging
 import platform
 
+from typing import Optional
+
 import voluptuous as vol
 import homeassistant.helpers.config_validation as cv
 
 from homeassistant.core import callback
 from homeassistant import config_entries
 from homeassistant.const import CONF_SCAN_INTERVAL
-from .core.const import CONF_SERVICES_LIST, SCAN_INTERVAL
-from .core.manager import Manager
+from .core.const import (
+    DOMAIN,
+    CONF_ADDRESS,
+    CONF_SERVICES_LIST,
+    CONF_PATTERNS,
+    CONF_PUSH_MODE,
+    CONF_BACKEND,
+    CONF_JOURNAL_SIZE,
+    CONF_RESOURCES,
+    CONF_HISTORY,
+    CONF_FILTER,
+    BACKEND_DBUS_PYTHON,
+    BACKENDS,
+    SCAN_INTERVAL,
+    DEFAULT_JOURNAL_SIZE,
+    MAX_JOURNAL_SIZE,
+    CATALOG_PAGE_SIZE
+)
+from .core.backend import async_create_manager
+from .core.units import UNIT_SUFFIXES
 
 _LOGGER = logging.getLogger(__name__)
 
 @config_entries.HANDLERS.register("systemd_manager")
 class SystemdManagerConfigFlow(config_entries.ConfigFlow):
+    def __init__(self) -> None:
+        self._address: str = ""
+
+    def _is_local_configured(self) -> bool:
+        return any(
+            not (entry.options.get(CONF_ADDRESS) or entry.data.get(CONF_ADDRESS))
+            for entry in self._async_current_entries()
+        )
+
     async def async_step_import(self, user_input = None):
-        if self._async_current_entries():
-            return self.async_abort(reason = "single_instance_allowed")
+        if self._is_local_configured():
+            return self.async_abort(reason = "already_configured")
+
+        await self.async_set_unique_id(platform.node())
+        self._abort_if_unique_id_configured()
 
         return self.async_create_entry(title = platform.node(), data = {})
 
     async def async_step_user(self, user_input = None):
-        if self._async_current_entries():
-            return self.async_abort(reason = "single_instance_allowed")
+        schema = vol.Schema({
+            vol.Optional(CONF_ADDRESS, default=""): cv.string,
+        })
+
+        if user_input is None:
+            return self.async_show_form(step_id = "user", data_schema = schema)
+
+        self._address = user_input.get(CONF_ADDRESS, "").strip()
+
+        if not self._address and self._is_local_configured():
+            return self.async_abort(reason = "already_configured")
+
+        await self.async_set_unique_id(self._address or platform.node())
+        self._abort_if_unique_id_configured()
 
-        options = list(Manager().list().keys())
-        options = sorted(options)
+        return await self.async_step_services()
+
+    async def async_step_services(self, user_input = None):
+        if user_input:
+            return self.async_create_entry(
+                title = self._address or platform.node(),
+                data = {CONF_ADDRESS: self._address} | user_input
+            )
+
+        try:
+            manager = await async_create_manager(self.hass, address = self._address)
+        except ConnectionError as e:
+            _LOGGER.error('Systemd Manager: %r', e)
+
+            return self.async_abort(reason = "cannot_connect")
+
+        try:
+            options = sorted(await manager.async_list())
+        finally:
+            await manager.async_close()
 
         schema = vol.Schema({
             vol.Required(CONF_SERVICES_LIST, default=[]): cv.multi_select(options),
+            vol.Optional(CONF_PATTERNS, default=""): cv.string,
         })
 
-        if user_input:
-            return self.async_create_entry(title = platform.node(), data = user_input)
-
-        return self.async_show_form(step_id = "user", data_schema = schema)
+        return self.async_show_form(step_id = "services", data_schema = schema)
 
     @staticmethod
     @callback
@@ -45,25 +105,95 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
         self.config_entry = config_entry
 
+        self._filter: str = ""
+        self._defaults: dict = {}
+
     async def async_step_init(self, user_input = None):
         return await self.async_step_settings(user_input)
 
+    async def _async_get_services(self, selected: list) -> Optional[dict]:
+        worker = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
+
+        if worker is None or not worker.is_connected:
+            try:
+                manager = await async_create_manager(
+                    self.hass,
+                    self.config_entry.options.get(CONF_BACKEND, BACKEND_DBUS_PYTHON),
+                    self.config_entry.options.get(CONF_ADDRESS, "")
+                )
+            except ConnectionError as e:
+                _LOGGER.error('Systemd Manager: %r', e)
+
+                return None
+
+            try:
+                services = {name: name for name in sorted(await manager.async_list()) if self._filter.lower() in name.lower()}
+            finally:
+                await manager.async_close()
+
+            return services | {name: name for name in selected if name not in services}
+
+        if worker.catalog.updated == 0:
+            await worker.async_refresh_catalog()
+        else:
+            worker.ensure_catalog()
+
+        services = worker.catalog.search(self._filter, CATALOG_PAGE_SIZE, UNIT_SUFFIXES)
+
+        return services | {name: worker.catalog.label(name) for name in selected if name not in services}
+
     async def async_step_settings(self, user_input = None):
-        options = list(Manager().list().keys())
-        options = sorted(options)
+        if user_input is not None and user_input.get(CONF_FILTER, "") != self._filter:
+            self._filter = user_input.get(CONF_FILTER, "")
+            self._defaults = {key: value for key, value in user_input.items() if key != CONF_FILTER}
+
+            user_input = None
+
+        if user_input:
+            user_input = {key: value for key, value in user_input.items() if key != CONF_FILTER}
+
+            return self.async_create_entry(title = self.config_entry.title, data = self.config_entry.options | user_input)
+
+        defaults = self.config_entry.options | self._defaults
+
+        services = await self._async_get_services(defaults.get(CONF_SERVICES_LIST, []))
+        if services is None:
+            return self.async_abort(reason = "cannot_connect")
 
         schema = vol.Schema({
+            vol.Optional(CONF_FILTER, default=self._filter): cv.string,
             vol.Required(
                 CONF_SERVICES_LIST,
-                default=self.config_entry.options.get(CONF_SERVICES_LIST, [])
-            ): cv.multi_select(options),
+                default=defaults.get(CONF_SERVICES_LIST, [])
+            ): cv.multi_select(services),
+            vol.Optional(
+                CONF_PATTERNS,
+                default=defaults.get(CONF_PATTERNS, "")
+            ): cv.string,
             vol.Optional(
                 CONF_SCAN_INTERVAL,
-                default=self.config_entry.options.get(CONF_SCAN_INTERVAL, SCAN_INTERVAL)
+                default=defaults.get(CONF_SCAN_INTERVAL, SCAN_INTERVAL)
             ): cv.positive_int,
+            vol.Optional(
+                CONF_PUSH_MODE,
+                default=defaults.get(CONF_PUSH_MODE, False)
+            ): cv.boolean,
+            vol.Optional(
+                CONF_BACKEND,
+                default=defaults.get(CONF_BACKEND, BACKEND_DBUS_PYTHON)
+            ): vol.In(BACKENDS),
+            vol.Optional(
+                CONF_JOURNAL_SIZE,
+                default=defaults.get(CONF_JOURNAL_SIZE, DEFAULT_JOURNAL_SIZE)
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_JOURNAL_SIZE)),
+            vol.Optional(
+                CONF_RESOURCES,
+                default=defaults.get(CONF_RESOURCES, False)
+            ): cv.boolean,
+            vol.Optional(
+                CONF_HISTORY,
+                default=defaults.get(CONF_HISTORY, False)
+            ): cv.boolean,
         })
 
-        if user_input:
-            return self.async_create_entry(title = platform.node(), data = user_input)
-
-        return self.async_show_form(step_id = "settings", data_schema = schema)
\ No newline at end of file
+        return self.async_show_form(step_id = "settings", data_schema = schema)
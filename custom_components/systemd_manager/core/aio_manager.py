@@ -0,0 +1,470 @@
+import os
+import logging
+import asyncio
+import time
+
+from typing import Optional, Callable
+from dbus_next import BusType, Message, MessageType, Variant
+from dbus_next.aio import MessageBus
+from dbus_next.errors import DBusError
+
+from .base import BaseManager, Mode, split_patterns
+from .cache import LruCache
+from .metrics import Metrics
+from .units import UNIT_SUFFIXES
+from .const import (
+    DBUS_BUS_NAME,
+    DBUS_OBJECT_PATH,
+    DBUS_INTERFACE,
+    SYSTEMD_BUS_NAME,
+    SYSTEMD_OBJECT_PATH,
+    MANAGER_INTERFACE,
+    PROPERTIES_INTERFACE,
+    UNIT_INTERFACE,
+    UNIT_CACHE_SIZE,
+    MAX_PENDING_CALLS,
+    STALE_ERRORS,
+    DISCONNECT_ERRORS,
+    UNKNOWN_PROPERTY_ERRORS,
+    UNKNOWN_METHOD_ERROR,
+    EVENT_UNIT_CHANGED,
+    EVENT_UNIT_NEW,
+    EVENT_UNIT_REMOVED,
+    EVENT_JOB_REMOVED,
+    EVENT_UNIT_FILES_CHANGED,
+    EVENT_RELOADED,
+    EVENT_CONNECTED,
+    EVENT_DISCONNECTED
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+class AsyncManager(BaseManager):
+    def __init__(self, address: Optional[str] = None, metrics: Optional[Metrics] = None) -> None:
+        self._address: Optional[str] = address
+        self._bus: Optional[MessageBus] = None
+        self._is_connected: bool = False
+        self._disconnect_task: Optional[asyncio.Task] = None
+        self._units: LruCache = LruCache(UNIT_CACHE_SIZE)
+        self._pending: asyncio.Semaphore = asyncio.Semaphore(MAX_PENDING_CALLS)
+
+        self.metrics: Metrics = metrics if metrics is not None else Metrics()
+
+        self._callback: Optional[Callable] = None
+        self._signals: list = []
+        self._watches: dict = {}
+        self._paths: dict = {}
+
+    async def async_connect(self) -> bool:
+        try:
+            if self._address:
+                self._bus = await MessageBus(bus_address = self._address).connect()
+            else:
+                self._bus = await MessageBus(bus_type = BusType.SYSTEM).connect()
+        except (DBusError, OSError) as e:
+            _LOGGER.error('Systemd Manager (DBus): %r', e)
+
+            return False
+
+        self._is_connected = True
+        self._disconnect_task = asyncio.get_running_loop().create_task(self._async_wait_for_disconnect())
+
+        self._bus.add_message_handler(self._on_message)
+
+        await self._async_add_match(
+            "type='signal',sender='{}',interface='{}',member='NameOwnerChanged',arg0='{}'".format(
+                DBUS_BUS_NAME, DBUS_INTERFACE, SYSTEMD_BUS_NAME
+            )
+        )
+
+        return True
+
+    @property
+    def is_connected(self) -> bool:
+        return self._is_connected and self._bus is not None and self._bus.connected
+
+    async def async_close(self) -> None:
+        self._signals = []
+        self._watches = {}
+        self._paths = {}
+        self._callback = None
+
+        self.invalidate()
+
+        if self._disconnect_task is not None:
+            self._disconnect_task.cancel()
+            self._disconnect_task = None
+
+        if self._bus is not None:
+            self._bus.disconnect()
+
+        self._is_connected = False
+
+    def invalidate(self) -> None:
+        self._units.clear()
+
+    def get_unit_paths(self) -> dict:
+        return dict(self._units.items())
+
+    async def async_preload(self, unit_paths: dict) -> None:
+        for unit_name, unit_path in unit_paths.items():
+            if unit_name not in self._units:
+                self._units.set(unit_name, unit_path)
+
+    async def async_list(self, unit_names: Optional[list] = None) -> dict:
+        services = {}
+
+        units = await self._async_list_units() if unit_names is None else await self._async_list_units_by_names(unit_names)
+
+        for unit in units or []:
+            unit_name = unit[0].strip()
+
+            if (unit_names is None and not unit_name.endswith(UNIT_SUFFIXES)) or unit_name in services or unit[2] == 'not-found':
+                _LOGGER.debug('Systemd Manager {}'.format(unit_name))
+
+                continue
+
+            services[unit[0]] = unit[4]
+
+        return services
+
+    async def async_list_units_details(self, unit_names: Optional[list] = None) -> Optional[dict]:
+        units = await self._async_list_units() if unit_names is None else await self._async_list_units_by_names(unit_names)
+
+        if units is None:
+            return None
+
+        return {
+            unit[0]: {"description": unit[1], "state": unit[4]}
+            for unit in units if unit[2] != 'not-found'
+        }
+
+    async def async_list_unit_files(self, patterns: Optional[list] = None) -> Optional[dict]:
+        if patterns is None:
+            reply = await self._async_call("ListUnitFiles")
+        elif len(patterns) > 0:
+            reply = await self._async_call("ListUnitFilesByPatterns", "asas", [[], patterns])
+        else:
+            return {}
+
+        return {os.path.basename(path): state for path, state in reply[0]} if reply is not None else None
+
+    async def async_start(self, unit_name: str, mode: Mode = Mode.REPLACE) -> Optional[str]:
+        return await self._async_call_job("StartUnit", unit_name, mode)
+
+    async def async_stop(self, unit_name: str, mode: Mode = Mode.REPLACE) -> Optional[str]:
+        return await self._async_call_job("StopUnit", unit_name, mode)
+
+    async def async_restart(self, unit_name: str, mode: Mode = Mode.REPLACE) -> Optional[str]:
+        return await self._async_call_job("RestartUnit", unit_name, mode)
+
+    async def async_enable(self, unit_names: list) -> bool:
+        return await self._async_call("EnableUnitFiles", "asbb", [unit_names, False, True]) is not None
+
+    async def async_disable(self, unit_names: list) -> bool:
+        return await self._async_call("DisableUnitFiles", "asb", [unit_names, False]) is not None
+
+    async def async_is_available(self, unit_name: str) -> bool:
+        return await self._async_call("GetUnitFileState", "s", [unit_name], with_error = False) is not None
+
+    async def async_start_transient(self, unit_name: str, properties: list, mode: Mode = Mode.FAIL) -> Optional[str]:
+        reply = await self._async_call("StartTransientUnit", "ssa(sv)a(sa(sv))", [
+            unit_name,
+            mode.value,
+            [[name, Variant(signature, value)] for name, signature, value in properties],
+            []
+        ])
+
+        return reply[0] if reply is not None else None
+
+    async def async_reset_failed(self, unit_name: str) -> bool:
+        return await self._async_call("ResetFailedUnit", "s", [unit_name], with_error = False) is not None
+
+    async def async_get_unit_properties(self, unit_name: str, unit_interface) -> Optional[dict]:
+        unit_path = await self._async_get_unit_path(unit_name)
+        if unit_path is None:
+            return None
+
+        reply = await self._async_call(
+            "GetAll", "s", [unit_interface], path = unit_path, interface = PROPERTIES_INTERFACE
+        )
+        if reply is None:
+            return None
+
+        return {key: variant.value for key, variant in reply[0].items()}
+
+    async def async_get_units_properties(self, unit_names: list, unit_properties: dict) -> dict:
+        requests = [(unit_interface, name) for unit_interface, names in unit_properties.items() for name in names]
+
+        async def async_get_properties(unit_name: str) -> Optional[dict]:
+            unit_path = await self._async_get_unit_path(unit_name)
+            if unit_path is None:
+                return None
+
+            replies = await asyncio.gather(*[
+                self._async_call(
+                    "Get", "ss", [unit_interface, name],
+                    path = unit_path, interface = PROPERTIES_INTERFACE, skipped_errors = UNKNOWN_PROPERTY_ERRORS
+                )
+                for unit_interface, name in requests
+            ])
+
+            properties, failed = {}, set()
+            for (unit_interface, name), reply in zip(requests, replies):
+                if reply is None:
+                    failed.add(unit_interface)
+                elif len(reply) > 0:
+                    properties.setdefault(unit_interface, {})[name] = reply[0].value
+
+            return {unit_interface: values for unit_interface, values in properties.items() if unit_interface not in failed}
+
+        results = await asyncio.gather(*[async_get_properties(unit_name) for unit_name in unit_names])
+
+        return {
+            unit_name: properties for unit_name, properties in zip(unit_names, results) if properties is not None
+        }
+
+    async def async_subscribe(self, callback: Callable) -> bool:
+        if await self._async_call("Subscribe") is None:
+            return False
+
+        self._callback = callback
+
+        for member in ["UnitNew", "UnitRemoved", "JobRemoved", "UnitFilesChanged", "Reloading"]:
+            rule = self._get_match_rule(MANAGER_INTERFACE, member, SYSTEMD_OBJECT_PATH)
+
+            if await self._async_add_match(rule):
+                self._signals.append(rule)
+
+        return True
+
+    async def async_watch(self, unit_names: list) -> None:
+        if self._callback is None:
+            return
+
+        for unit_name in unit_names:
+            if unit_name in self._watches:
+                continue
+
+            unit_path = await self._async_get_unit_path(unit_name)
+            if unit_path is None:
+                continue
+
+            rule = self._get_match_rule(PROPERTIES_INTERFACE, "PropertiesChanged", unit_path)
+            if not await self._async_add_match(rule):
+                continue
+
+            self._watches[unit_name] = rule
+            self._paths[unit_path] = unit_name
+
+        unit_names = set(unit_names)
+        for unit_name in [name for name in self._watches if name not in unit_names]:
+            await self._async_remove_watch(unit_name)
+
+    async def async_unsubscribe(self) -> None:
+        if self._callback is None:
+            return
+
+        for unit_name in list(self._watches):
+            await self._async_remove_watch(unit_name)
+
+        for rule in self._signals:
+            await self._async_call(
+                "RemoveMatch", "s", [rule],
+                path = DBUS_OBJECT_PATH, interface = DBUS_INTERFACE, destination = DBUS_BUS_NAME
+            )
+
+        self._signals = []
+        self._callback = None
+
+        await self._async_call("Unsubscribe", with_error = False)
+
+    def _on_message(self, message: Message) -> None:
+        if message.message_type != MessageType.SIGNAL:
+            return
+
+        if message.interface == DBUS_INTERFACE and message.member == "NameOwnerChanged":
+            _LOGGER.debug('Systemd Manager: %s owner changed, dropping cached paths', message.body[0])
+
+            self.invalidate()
+            self._is_connected = bool(message.body[2])
+
+            if self._callback is not None:
+                self._callback(EVENT_CONNECTED if message.body[2] else EVENT_DISCONNECTED, message.body[0], {})
+
+        if message.interface == MANAGER_INTERFACE and message.member == "UnitRemoved":
+            self._units.pop(message.body[0])
+
+        if self._callback is None:
+            return
+
+        if message.interface == MANAGER_INTERFACE and message.member == "UnitNew":
+            self._callback(EVENT_UNIT_NEW, message.body[0], {})
+
+        if message.interface == MANAGER_INTERFACE and message.member == "UnitRemoved":
+            self._callback(EVENT_UNIT_REMOVED, message.body[0], {})
+
+        if message.interface == MANAGER_INTERFACE and message.member == "JobRemoved":
+            self._callback(EVENT_JOB_REMOVED, message.body[2], {"job": message.body[1], "result": message.body[3]})
+
+        if message.interface == MANAGER_INTERFACE and message.member == "UnitFilesChanged":
+            self._callback(EVENT_UNIT_FILES_CHANGED, "", {})
+
+        if message.interface == MANAGER_INTERFACE and message.member == "Reloading" and not message.body[0]:
+            self._callback(EVENT_RELOADED, "", {})
+
+        if (
+            message.interface == PROPERTIES_INTERFACE
+            and message.member == "PropertiesChanged"
+            and message.path in self._paths
+            and message.body[0] == UNIT_INTERFACE
+        ):
+            self._callback(
+                EVENT_UNIT_CHANGED,
+                self._paths[message.path],
+                {key: variant.value for key, variant in message.body[1].items()}
+            )
+
+    async def _async_wait_for_disconnect(self) -> None:
+        try:
+            await self._bus.wait_for_disconnect()
+        except Exception as e:
+            _LOGGER.debug('Systemd Manager (DBus): connection closed: %r', e)
+
+        self._is_connected = False
+
+        if self._callback is not None:
+            self._callback(EVENT_DISCONNECTED, SYSTEMD_BUS_NAME, {})
+
+    async def _async_call_job(self, member: str, unit_name: str, mode: Mode) -> Optional[str]:
+        reply = await self._async_call(member, "ss", [unit_name, mode.value])
+
+        return reply[0] if reply is not None else None
+
+    async def _async_list_units(self) -> Optional[list]:
+        reply = await self._async_call("ListUnits")
+
+        return reply[0] if reply is not None else None
+
+    async def _async_list_units_by_names(self, unit_names: list) -> Optional[list]:
+        names, patterns = split_patterns(unit_names)
+        replies = []
+
+        if len(names) > 0:
+            replies.append(await self._async_call("ListUnitsByNames", "as", [names], skipped_errors = [UNKNOWN_METHOD_ERROR]))
+
+        if len(patterns) > 0:
+            replies.append(
+                await self._async_call("ListUnitsByPatterns", "asas", [[], patterns], skipped_errors = [UNKNOWN_METHOD_ERROR])
+            )
+
+        if None in replies:
+            return None
+
+        if [] in replies:
+            _LOGGER.debug('Systemd Manager: ListUnitsByNames is not supported, falling back to ListUnits')
+
+            return await self._async_list_units()
+
+        return [unit for reply in replies for unit in reply[0]]
+
+    async def _async_remove_watch(self, unit_name: str) -> None:
+        rule = self._watches.pop(unit_name)
+
+        for unit_path in [path for path, name in self._paths.items() if name == unit_name]:
+            del self._paths[unit_path]
+
+        await self._async_call(
+            "RemoveMatch", "s", [rule],
+            path = DBUS_OBJECT_PATH, interface = DBUS_INTERFACE, destination = DBUS_BUS_NAME
+        )
+
+    async def _async_add_match(self, rule: str) -> bool:
+        return await self._async_call(
+            "AddMatch", "s", [rule],
+            path = DBUS_OBJECT_PATH, interface = DBUS_INTERFACE, destination = DBUS_BUS_NAME
+        ) is not None
+
+    async def _async_get_unit_path(self, unit_name: str) -> Optional[str]:
+        unit_path = self._units.get(unit_name)
+        if unit_path is not None:
+            return unit_path
+
+        reply = await self._async_call("LoadUnit", "s", [unit_name])
+        if reply is None:
+            return None
+
+        self._units.set(unit_name, reply[0])
+
+        return reply[0]
+
+    async def _async_call(
+        self,
+        member: str,
+        signature: str = "",
+        body: Optional[list] = None,
+        path: str = SYSTEMD_OBJECT_PATH,
+        interface: str = MANAGER_INTERFACE,
+        destination: str = SYSTEMD_BUS_NAME,
+        with_error: bool = True,
+        skipped_errors: Optional[list] = None
+    ) -> Optional[list]:
+        if self._bus is None or not self._bus.connected:
+            self._is_connected = False
+
+            return None
+
+        try:
+            async with self._pending:
+                started = time.perf_counter()
+
+                reply = await self._bus.call(Message(
+                    destination = destination,
+                    path = path,
+                    interface = interface,
+                    member = member,
+                    signature = signature,
+                    body = body or []
+                ))
+        except (DBusError, OSError, EOFError) as e:
+            self.metrics.observe(member, time.perf_counter() - started, True)
+
+            if not self._bus.connected:
+                self._is_connected = False
+
+                _LOGGER.debug('Systemd Manager (DBus): %r', e)
+
+                return None
+
+            _LOGGER.error('Systemd Manager (DBus): %r', e)
+
+            return None
+
+        self.metrics.observe(member, time.perf_counter() - started, reply.message_type == MessageType.ERROR)
+
+        if reply.message_type == MessageType.ERROR:
+            if skipped_errors is not None and reply.error_name in skipped_errors:
+                return []
+
+            if reply.error_name in STALE_ERRORS:
+                self.invalidate()
+
+            if reply.error_name in DISCONNECT_ERRORS and destination == SYSTEMD_BUS_NAME:
+                self._is_connected = False
+
+                _LOGGER.debug('Systemd Manager (DBus): %s %r', reply.error_name, reply.body)
+
+                return None
+
+            if with_error:
+                _LOGGER.error('Systemd Manager (DBus): %s %r', reply.error_name, reply.body)
+
+            return None
+
+        return reply.body
+
+    @staticmethod
+    def _get_match_rule(interface: str, member: str, path: str) -> str:
+        return "type='signal',sender='{}',interface='{}',member='{}',path='{}'".format(
+            SYSTEMD_BUS_NAME, interface, member, path
+        )
@@ -0,0 +1,73 @@
+import asyncio
+import functools
+
+from typing import Optional
+
+from homeassistant.core import HomeAssistant
+
+from .base import BaseManager
+from .metrics import Metrics
+from .const import BACKEND_DBUS_PYTHON, BACKEND_DBUS_NEXT, BACKEND_HELPER, PROPERTIES_BATCH_SIZE
+
+async def async_create_manager(
+    hass: HomeAssistant,
+    backend: str = BACKEND_DBUS_PYTHON,
+    address: Optional[str] = None,
+    metrics: Optional[Metrics] = None
+) -> BaseManager:
+    if backend == BACKEND_DBUS_NEXT:
+        from .aio_manager import AsyncManager
+
+        manager = AsyncManager(address, metrics)
+        if not await manager.async_connect():
+            raise ConnectionError("Unable to connect to {}".format(address or "the system bus"))
+
+        return manager
+
+    if backend == BACKEND_HELPER:
+        from .process import ProcessManager
+
+        manager = ProcessManager(address, metrics)
+        if not await manager.async_connect():
+            raise ConnectionError("Unable to start the D-Bus helper for {}".format(address or "the system bus"))
+
+        return manager
+
+    from .manager import Manager
+
+    return ExecutorManager(hass, await hass.async_add_executor_job(Manager, address, metrics))
+
+class ExecutorManager(BaseManager):
+    def __init__(self, hass: HomeAssistant, manager: BaseManager) -> None:
+        self._hass = hass
+        self._manager = manager
+
+    def __getattr__(self, name: str):
+        if not name.startswith('async_'):
+            return getattr(self._manager, name)
+
+        method = getattr(self._manager, name[len('async_'):])
+
+        async def async_call(*args, **kwargs):
+            return await self._hass.async_add_executor_job(functools.partial(method, *args, **kwargs))
+
+        return async_call
+
+    async def async_close(self) -> None:
+        await self._hass.async_add_executor_job(self._manager.close)
+
+    async def async_get_units_properties(self, unit_names: list, unit_properties: dict) -> dict:
+        results = await asyncio.gather(*[
+            self._hass.async_add_executor_job(
+                self._manager.get_units_properties,
+                unit_names[index:index + PROPERTIES_BATCH_SIZE],
+                unit_properties
+            )
+            for index in range(0, len(unit_names), PROPERTIES_BATCH_SIZE)
+        ])
+
+        properties = {}
+        for result in results:
+            properties |= result
+
+        return properties
@@ -0,0 +1,67 @@
+import logging
+import datetime
+
+from typing import Optional
+from enum import Enum
+
+_LOGGER = logging.getLogger(__name__)
+
+def is_pattern(unit_name: str) -> bool:
+    return any(char in unit_name for char in "*?[")
+
+def split_patterns(unit_names: list) -> tuple:
+    return (
+        [unit_name for unit_name in unit_names if not is_pattern(unit_name)],
+        [unit_name for unit_name in unit_names if is_pattern(unit_name)]
+    )
+
+class Mode(Enum):
+    REPLACE = "replace"
+    FAIL = "fail"
+    ISOLATE = "isolate"
+    IGNORE_DEPENDENCIES = "ignore-dependencies"
+    IGNORE_REQUIREMENTS = "ignore-requirements"
+
+
+class BaseManager(object):
+    def get_exec_status(self, properties: Optional[dict] = None) -> Optional[int]:
+        try:
+            return int(properties["ExecMainStatus"])
+        except KeyError as e:
+            _LOGGER.error('Systemd Manager (DBus): %r', e)
+
+            return None
+
+    def get_type(self, properties: Optional[dict] = None) -> Optional[str]:
+        try:
+            return str(properties["Type"])
+        except KeyError as e:
+            _LOGGER.error('Systemd Manager (DBus): %r', e)
+
+            return None
+
+    def get_last_activity(self, properties: Optional[dict] = None) -> Optional[str]:
+        try:
+            return datetime.datetime \
+                .utcfromtimestamp(int(properties["StateChangeTimestamp"]) / 1000000) \
+                .strftime('%Y-%m-%d %H:%M:%S')
+        except KeyError as e:
+            _LOGGER.error('Systemd Manager (DBus): %r', e)
+
+            return None
+
+    def get_triggered_by(self, properties: Optional[dict] = None) -> Optional[str]:
+        try:
+            return ', '.join(list(properties["TriggeredBy"]))
+        except KeyError as e:
+            _LOGGER.error('Systemd Manager (DBus): %r', e)
+
+            return None
+
+    def get_result(self, properties: Optional[dict] = None) -> Optional[str]:
+        try:
+            return properties["Result"].encode("utf-8")
+        except KeyError as e:
+            _LOGGER.error('Systemd Manager (DBus): %r', e)
+
+            return None
@@ -0,0 +1,45 @@
+import threading
+
+from collections import OrderedDict
+from typing import Any, Optional
+
+class LruCache(object):
+    def __init__(self, max_size: int) -> None:
+        self._max_size: int = max_size
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key not in self._items:
+                return None
+
+            self._items.move_to_end(key)
+
+            return self._items[key]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+
+            while len(self._items) > self._max_size:
+                self._items.popitem(last = False)
+
+    def pop(self, key: str) -> Optional[Any]:
+        with self._lock:
+            return self._items.pop(key, None)
+
+    def items(self) -> list:
+        with self._lock:
+            return list(self._items.items())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
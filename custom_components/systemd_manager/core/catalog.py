@@ -0,0 +1,87 @@
+import time
+import fnmatch
+
+from typing import Optional
+
+from .base import is_pattern
+
+class UnitCatalog(object):
+    def __init__(self) -> None:
+        self._units: dict = {}
+        self._updated: float = 0
+
+    @property
+    def updated(self) -> float:
+        return self._updated
+
+    def update_units(self, units: dict, is_full: bool = False) -> None:
+        if is_full:
+            for unit_name in [name for name in self._units if name not in units]:
+                self.remove_unit(unit_name)
+
+        for unit_name, details in units.items():
+            self._units.setdefault(unit_name, {"description": "", "state": None, "file_state": None}).update(details)
+
+        if is_full:
+            self._updated = time.monotonic()
+
+    def update_files(self, unit_files: dict) -> None:
+        for unit_name in [name for name in self._units if name not in unit_files]:
+            self._units[unit_name]["file_state"] = None
+            self._discard(unit_name)
+
+        for unit_name, file_state in unit_files.items():
+            self._units.setdefault(unit_name, {"description": "", "state": None, "file_state": None})["file_state"] = file_state
+
+    def remove_unit(self, unit_name: str) -> None:
+        if unit_name not in self._units:
+            return
+
+        self._units[unit_name]["state"] = None
+        self._discard(unit_name)
+
+    def label(self, unit_name: str) -> str:
+        unit = self._units.get(unit_name)
+        if unit is None:
+            return unit_name
+
+        states = ", ".join(state for state in [unit["state"], unit["file_state"]] if state)
+        label = "{} - {}".format(unit_name, unit["description"]) if unit["description"] else unit_name
+
+        return "{} ({})".format(label, states) if states else label
+
+    def search(self, query: str = "", limit: Optional[int] = None, suffixes: Optional[tuple] = None) -> dict:
+        query = query.strip().lower()
+
+        names = []
+        for unit_name in sorted(self._units):
+            if suffixes is not None and not unit_name.endswith(suffixes):
+                continue
+
+            if query and not self._match(unit_name, query):
+                continue
+
+            names.append(unit_name)
+
+            if limit is not None and len(names) >= limit:
+                break
+
+        return {unit_name: self.label(unit_name) for unit_name in names}
+
+    def _match(self, unit_name: str, query: str) -> bool:
+        if is_pattern(query):
+            return fnmatch.fnmatchcase(unit_name.lower(), query)
+
+        return query in unit_name.lower() or query in self._units[unit_name]["description"].lower()
+
+    def _discard(self, unit_name: str) -> None:
+        unit = self._units[unit_name]
+
+        if unit["state"] is None and unit["file_state"] is None:
+            del self._units[unit_name]
+
+    def __contains__(self, unit_name: str) -> bool:
+        return unit_name in self._units
+
+    def __len__(self) -> int:
+        return len(self._units)
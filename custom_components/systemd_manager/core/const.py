@@ -1,13 +1,129 @@
 DOMAIN = "systemd_manager"
+PLATFORMS = ["switch", "sensor", "binary_sensor"]
 
 SCAN_INTERVAL = 10
-DATA_UPDATED = "systemd_manager_data_updated"
+RECONCILE_INTERVAL = 300
+FAST_SCAN_INTERVAL = 1
+FAST_WINDOW = 30
+BACKOFF_FACTOR = 2
+MAX_BACKOFF = 8
+DATA_UPDATED = "systemd_manager_data_updated_{}"
+SERVICE_UPDATED = "systemd_manager_service_updated_{}_{}"
+COALESCE_DELAY = 0.5
+STORAGE_VERSION = 1
+STORAGE_KEY = "systemd_manager.{}"
+SNAPSHOT_DELAY = 30
+CATALOG_TTL = 3600
+CATALOG_DELAY = 5
+CATALOG_PAGE_SIZE = 200
+METRICS_UPDATED = "systemd_manager_metrics_updated_{}"
+RESOURCES_UPDATED = "systemd_manager_resources_updated_{}"
+HISTORY_UPDATED = "systemd_manager_history_updated_{}_{}"
+HISTORY_TICK = "systemd_manager_history_tick_{}"
+METRICS_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+DEFAULT_CONCURRENCY = 10
+DEFAULT_JOB_TIMEOUT = 60
+JOB_CACHE_SIZE = 256
+RECONNECT_INTERVAL = 1
+MAX_RECONNECT_INTERVAL = 60
+DEFAULT_JOURNAL_SIZE = 0
+MAX_JOURNAL_SIZE = 1000
+JOURNAL_BATCH_SIZE = 500
+JOURNAL_MESSAGE_SIZE = 2048
+JOURNAL_UNIT_FIELD = "_SYSTEMD_UNIT"
+CGROUP_ROOT = "/sys/fs/cgroup"
+HISTORY_SIZE = 64
+HISTORY_WINDOW = 86400
+FLAP_WINDOW = 600
+FLAP_THRESHOLD = 3
+HISTORY_TICK_INTERVAL = 300
+UNAVAILABLE_STATE = "unavailable"
+UINT64_MAX = 2 ** 64 - 1
+HELPER_TIMEOUT = 30
+RUN_UNIT_PREFIX = "systemd-manager-run-"
+JOB_POLL_INTERVAL = 1
+PENDING_STATES = frozenset(["activating", "deactivating", "reloading", "refreshing"])
+RUN_OUTPUT_SETTLE = 0.25
+RUN_OUTPUT_WAIT = 2
+DEFAULT_RUN_TIMEOUT = 300
+HELPER_BUFFER_SIZE = 2 ** 24
 
+EVENT_ACTION_RESULT = "systemd_manager_action_result"
+
+DBUS_BUS_NAME = "org.freedesktop.DBus"
+DBUS_OBJECT_PATH = "/org/freedesktop/DBus"
+DBUS_INTERFACE = "org.freedesktop.DBus"
+SYSTEMD_BUS_NAME = "org.freedesktop.systemd1"
+SYSTEMD_OBJECT_PATH = "/org/freedesktop/systemd1"
+MANAGER_INTERFACE = "org.freedesktop.systemd1.Manager"
+PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
 UNIT_INTERFACE = "org.freedesktop.systemd1.Unit"
 SERVICE_UNIT_INTERFACE = "org.freedesktop.systemd1.Service"
+TIMER_UNIT_INTERFACE = "org.freedesktop.systemd1.Timer"
+SOCKET_UNIT_INTERFACE = "org.freedesktop.systemd1.Socket"
+MOUNT_UNIT_INTERFACE = "org.freedesktop.systemd1.Mount"
+PATH_UNIT_INTERFACE = "org.freedesktop.systemd1.Path"
+SCOPE_UNIT_INTERFACE = "org.freedesktop.systemd1.Scope"
+PROPERTIES_BATCH_SIZE = 10
+UNIT_CACHE_SIZE = 1024
+MAX_PENDING_CALLS = 64
+
+UNKNOWN_METHOD_ERROR = "org.freedesktop.DBus.Error.UnknownMethod"
+
+STALE_ERRORS = [
+    "org.freedesktop.DBus.Error.ServiceUnknown",
+    "org.freedesktop.DBus.Error.NameHasNoOwner",
+    "org.freedesktop.DBus.Error.NoReply",
+    "org.freedesktop.DBus.Error.Disconnected",
+    "org.freedesktop.DBus.Error.UnknownObject",
+]
+
+UNKNOWN_PROPERTY_ERRORS = [
+    "org.freedesktop.DBus.Error.UnknownProperty",
+    "org.freedesktop.DBus.Error.UnknownInterface",
+    "org.freedesktop.DBus.Error.InvalidArgs",
+]
+
+DISCONNECT_ERRORS = [
+    "org.freedesktop.DBus.Error.ServiceUnknown",
+    "org.freedesktop.DBus.Error.NameHasNoOwner",
+    "org.freedesktop.DBus.Error.Disconnected",
+]
 
+CONF_ADDRESS = "address"
 CONF_SERVICES_LIST = "services"
+CONF_PATTERNS = "patterns"
 CONF_MODE = "mode"
+CONF_CONCURRENCY = "concurrency"
+CONF_WAIT = "wait"
+CONF_TIMEOUT = "timeout"
+CONF_ACTION = "action"
+CONF_PUSH_MODE = "push_mode"
+CONF_BACKEND = "backend"
+CONF_JOURNAL_SIZE = "journal_size"
+CONF_RESOURCES = "resources"
+CONF_HISTORY = "history"
+CONF_FILTER = "filter"
+CONF_LINES = "lines"
+CONF_COMMAND = "command"
+CONF_HOST = "host"
+CONF_CPU_QUOTA = "cpu_quota"
+CONF_MEMORY_MAX = "memory_max"
+CONF_RUNTIME_MAX = "runtime_max"
+
+BACKEND_DBUS_PYTHON = "dbus-python"
+BACKEND_DBUS_NEXT = "dbus-next"
+BACKEND_HELPER = "helper"
+BACKENDS = [BACKEND_DBUS_PYTHON, BACKEND_DBUS_NEXT, BACKEND_HELPER]
+
+EVENT_UNIT_CHANGED = "changed"
+EVENT_UNIT_NEW = "new"
+EVENT_UNIT_REMOVED = "removed"
+EVENT_JOB_REMOVED = "job_removed"
+EVENT_UNIT_FILES_CHANGED = "unit_files_changed"
+EVENT_RELOADED = "reloaded"
+EVENT_CONNECTED = "connected"
+EVENT_DISCONNECTED = "disconnected"
 
 ATTR_UNIT_NAME = "unit_name"
 ATTR_REAL_STATE = "real_state"
@@ -15,9 +131,47 @@ ATTR_TYPE = "type"
 ATTR_EXIT_CODE = "exit_code"
 ATTR_LAST_ACTIVITY = "last_activity"
 ATTR_TRIGGERED_BY = "triggered_by"
+ATTR_UNIT_FILE_STATE = "unit_file_state"
+ATTR_NEXT_ELAPSE = "next_elapse"
+ATTR_LAST_TRIGGER = "last_trigger"
+ATTR_UNIT = "unit"
+ATTR_ACCEPTED = "accepted"
+ATTR_CONNECTIONS = "connections"
+ATTR_WHAT = "what"
+ATTR_WHERE = "where"
+ATTR_RESULT = "result"
+ATTR_CPU = "cpu"
+ATTR_MEMORY = "memory"
+ATTR_TASKS = "tasks"
+ATTR_IO_READ = "io_read"
+ATTR_IO_WRITE = "io_write"
+ATTR_UPTIME = "uptime"
+ATTR_RESTARTS = "restarts"
+ATTR_FAILURES = "failures"
+ATTR_MTTR = "mttr"
+ATTR_FLAPPING = "flapping"
+
+RESOURCE_PROPERTIES = {
+    ATTR_CPU: "CPUUsageNSec",
+    ATTR_MEMORY: "MemoryCurrent",
+    ATTR_TASKS: "TasksCurrent",
+    ATTR_IO_READ: "IOReadBytes",
+    ATTR_IO_WRITE: "IOWriteBytes",
+}
+
+UNRECORDED_ATTRIBUTES = frozenset([
+    ATTR_LAST_ACTIVITY,
+    ATTR_NEXT_ELAPSE,
+    ATTR_LAST_TRIGGER,
+    ATTR_ACCEPTED,
+    ATTR_CONNECTIONS,
+])
 
 SERVICE_START = "start"
 SERVICE_STOP = "stop"
 SERVICE_RESTART = "restart"
 SERVICE_ENABLE = "enable"
-SERVICE_DISABLE = "disable"
\ No newline at end of file
+SERVICE_DISABLE = "disable"
+SERVICE_CASCADE = "cascade"
+SERVICE_IMPACT = "impact"
+SERVICE_RUN = "run"
@@ -0,0 +1,131 @@
+import sys
+import logging
+
+from typing import Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+DEPENDENCY_PROPERTIES = ["Requires", "Wants", "After", "BoundBy"]
+
+def _names(properties: dict, name: str) -> frozenset:
+    return frozenset(sys.intern(str(unit)) for unit in properties.get(name, []))
+
+class DependencyGraph(object):
+    def __init__(self) -> None:
+        self._nodes: dict = {}
+        self._dependents: dict = {}
+        self._is_built: bool = False
+
+    @property
+    def is_built(self) -> bool:
+        return self._is_built
+
+    def invalidate(self) -> None:
+        self._nodes = {}
+        self._dependents = {}
+        self._is_built = False
+
+    def build(self, units: dict) -> None:
+        self.invalidate()
+
+        for unit_name, properties in units.items():
+            self.update(unit_name, properties)
+
+        self._is_built = True
+
+    def update(self, unit_name: str, properties: dict) -> None:
+        self.remove(unit_name)
+
+        requires, wants, after, bound_by = [_names(properties, name) for name in DEPENDENCY_PROPERTIES]
+
+        self._nodes[unit_name] = (requires, wants, after, bound_by)
+
+        for dependency in requires | wants:
+            self._dependents.setdefault(dependency, set()).add(unit_name)
+
+        self._dependents.setdefault(unit_name, set()).update(bound_by)
+
+    def remove(self, unit_name: str) -> None:
+        node = self._nodes.pop(unit_name, None)
+        if node is None:
+            return
+
+        requires, wants, _, bound_by = node
+
+        for dependency in requires | wants:
+            dependents = self._dependents.get(dependency)
+            if dependents is not None:
+                dependents.discard(unit_name)
+
+        dependents = self._dependents.get(unit_name)
+        if dependents is not None:
+            dependents.difference_update(bound_by)
+
+    def retain(self, unit_names: set) -> None:
+        for unit_name in [name for name in self._nodes if name not in unit_names]:
+            self.remove(unit_name)
+
+    def __contains__(self, unit_name: str) -> bool:
+        return unit_name in self._nodes
+
+    def dependents(self, unit_name: str) -> set:
+        return {name for name in self._dependents.get(unit_name, set()) if name in self._nodes}
+
+    def impact(self, unit_name: str) -> list:
+        impact, queue, seen = [], [unit_name], {unit_name}
+
+        while queue:
+            for dependent in sorted(self.dependents(queue.pop(0))):
+                if dependent in seen:
+                    continue
+
+                seen.add(dependent)
+                impact.append(dependent)
+                queue.append(dependent)
+
+        return impact
+
+    def levels(self, unit_names: list) -> list:
+        units = set(unit_names)
+        predecessors = {unit_name: self._predecessors(unit_name) & units for unit_name in units}
+
+        levels = []
+        while predecessors:
+            level = sorted(name for name, before in predecessors.items() if not before)
+
+            if len(level) == 0:
+                level = sorted(predecessors)
+
+                _LOGGER.warning('Systemd Manager: ordering cycle between %s', ', '.join(level))
+
+            levels.append(level)
+
+            for unit_name in level:
+                del predecessors[unit_name]
+
+            for before in predecessors.values():
+                before.difference_update(level)
+
+        return levels
+
+    def _predecessors(self, unit_name: str) -> set:
+        node = self._nodes.get(unit_name)
+        predecessors = set() if node is None else set(node[0] | node[1] | node[2])
+
+        for name, (_, _, _, bound_by) in self._nodes.items():
+            if unit_name in bound_by:
+                predecessors.add(name)
+
+        return predecessors
+
+    def get(self, unit_name: str) -> Optional[dict]:
+        node = self._nodes.get(unit_name)
+        if node is None:
+            return None
+
+        return {
+            name: sorted(values) for name, values in zip(DEPENDENCY_PROPERTIES, node)
+        } | {"dependents": sorted(self.dependents(unit_name))}
+
+    def as_dict(self) -> dict:
+        return {unit_name: self.get(unit_name) for unit_name in sorted(self._nodes)}
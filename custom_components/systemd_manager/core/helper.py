@@ -0,0 +1,122 @@
+import os
+import sys
+import json
+import types
+import logging
+import importlib
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+HELPER_WORKERS = 4
+HELPER_PACKAGE = "_systemd_manager_core"
+
+METHODS = frozenset([
+    "list",
+    "list_units_details",
+    "list_unit_files",
+    "start",
+    "stop",
+    "restart",
+    "enable",
+    "disable",
+    "is_available",
+    "start_transient",
+    "reset_failed",
+    "get_units_properties",
+    "subscribe",
+    "watch",
+    "unsubscribe",
+    "preload",
+])
+
+JOB_METHODS = frozenset(["start", "stop", "restart"])
+
+CHANGED_PROPERTIES = frozenset(["ActiveState", "SubState"])
+
+_LOGGER = logging.getLogger(__name__)
+
+class Output(object):
+    def __init__(self, stream) -> None:
+        self._stream = stream
+        self._lock = threading.Lock()
+
+    def write(self, message: dict) -> None:
+        line = json.dumps(message, separators = (",", ":"), default = str)
+
+        with self._lock:
+            self._stream.write(line + "\n")
+            self._stream.flush()
+
+def _compact(properties: dict) -> dict:
+    return {key: value for key, value in properties.items() if key in CHANGED_PROPERTIES or key in ["job", "result"]}
+
+def handle(manager, output: Output, request: dict, mode) -> None:
+    method, args = request["method"], request.get("args", [])
+
+    if method in JOB_METHODS:
+        args = [args[0], mode(args[1])]
+
+    if method == "start_transient":
+        args = [args[0], args[1], mode(args[2])]
+
+    if method == "subscribe":
+        args = [lambda event, unit_name, properties: output.write({
+            "event": event, "unit": str(unit_name), "properties": _compact(properties)
+        })]
+
+    try:
+        if method not in METHODS:
+            raise AttributeError(method)
+
+        output.write({"id": request["id"], "result": getattr(manager, method)(*args), "connected": manager.is_connected})
+    except Exception as e:
+        output.write({"id": request["id"], "error": repr(e), "connected": manager.is_connected})
+
+def serve(manager, stream, output: Output, mode) -> None:
+    executor = ThreadPoolExecutor(HELPER_WORKERS)
+
+    try:
+        for line in stream:
+            request = json.loads(line)
+
+            if request.get("method") == "close":
+                break
+
+            executor.submit(handle, manager, output, request, mode)
+    finally:
+        executor.shutdown(wait = True)
+        manager.close()
+
+def _import(name: str):
+    if HELPER_PACKAGE not in sys.modules:
+        package = types.ModuleType(HELPER_PACKAGE)
+        package.__path__ = [os.path.dirname(os.path.abspath(__file__))]
+
+        sys.modules[HELPER_PACKAGE] = package
+
+    return importlib.import_module("{}.{}".format(HELPER_PACKAGE, name))
+
+def main() -> int:
+    logging.basicConfig(stream = sys.stderr, level = logging.WARNING)
+
+    Mode = _import("base").Mode
+    Manager = _import("manager").Manager
+
+    output = Output(sys.stdout)
+
+    try:
+        manager = Manager(sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] else None)
+    except ConnectionError as e:
+        output.write({"error": str(e)})
+
+        return 1
+
+    output.write({"ready": True, "pid": os.getpid()})
+
+    serve(manager, sys.stdin, output, Mode)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+import sys
+import time
+
+from array import array
+from typing import Optional
+
+from .const import (
+    HISTORY_SIZE,
+    HISTORY_WINDOW,
+    FLAP_WINDOW,
+    FLAP_THRESHOLD,
+    UNAVAILABLE_STATE,
+    ATTR_UPTIME,
+    ATTR_RESTARTS,
+    ATTR_FAILURES,
+    ATTR_MTTR,
+    ATTR_FLAPPING,
+)
+
+RESULT_UNKNOWN = -1
+OTHER_STATE_CODE = 255
+
+_STATES: list = []
+_CODES: dict = {}
+
+def state_code(state: str) -> int:
+    code = _CODES.get(state)
+    if code is not None:
+        return code
+
+    if len(_STATES) >= OTHER_STATE_CODE:
+        return OTHER_STATE_CODE
+
+    code = len(_STATES)
+    _STATES.append(sys.intern(state))
+    _CODES[_STATES[code]] = code
+
+    return code
+
+def state_name(code: int) -> str:
+    return _STATES[code] if code < len(_STATES) else "other"
+
+UNAVAILABLE_CODE = state_code(UNAVAILABLE_STATE)
+
+class Timeline(object):
+    __slots__ = ("_timestamps", "_states", "_results", "_start", "_count")
+
+    def __init__(self, capacity: int = HISTORY_SIZE) -> None:
+        self._timestamps: array = array("d", [0.0]) * capacity
+        self._states: array = array("B", [0]) * capacity
+        self._results: array = array("i", [0]) * capacity
+        self._start: int = 0
+        self._count: int = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._states)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, state: str, result: Optional[int] = None, timestamp: Optional[float] = None) -> bool:
+        code = state_code(state)
+        result = result if result is not None else RESULT_UNKNOWN
+
+        if self._count > 0:
+            last = (self._start + self._count - 1) % self.capacity
+
+            if self._states[last] == code:
+                is_changed = self._results[last] != result
+                self._results[last] = result
+
+                return is_changed
+
+        if self._count < self.capacity:
+            index = (self._start + self._count) % self.capacity
+            self._count += 1
+        else:
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+
+        self._timestamps[index] = timestamp if timestamp is not None else time.time()
+        self._states[index] = code
+        self._results[index] = result
+
+        return True
+
+    def entries(self) -> list:
+        entries = []
+
+        for offset in range(self._count):
+            index = (self._start + offset) % self.capacity
+            entries.append((self._timestamps[index], self._states[index], self._results[index]))
+
+        return entries
+
+    def stats(self, on_states: frozenset, window: float = HISTORY_WINDOW, now: Optional[float] = None) -> dict:
+        now = now if now is not None else time.time()
+        since = now - window
+        on_codes = {state_code(state) for state in on_states}
+
+        entries = self.entries()
+
+        on_time = known_time = 0.0
+        restarts, downtimes = [], []
+        failures = 0
+        is_on, down_since = None, None
+
+        for position, (timestamp, code, result) in enumerate(entries):
+            if code == UNAVAILABLE_CODE:
+                continue
+
+            end = entries[position + 1][0] if position + 1 < len(entries) else now
+            duration = min(end, now) - max(timestamp, since)
+
+            if duration > 0:
+                known_time += duration
+
+                if code in on_codes:
+                    on_time += duration
+
+            if code in on_codes:
+                if down_since is not None and timestamp >= since:
+                    restarts.append(timestamp)
+                    downtimes.append(timestamp - down_since)
+
+                down_since = None
+            elif is_on:
+                down_since = timestamp
+
+                if result not in (0, RESULT_UNKNOWN) and timestamp >= since:
+                    failures += 1
+
+            is_on = code in on_codes
+
+        flaps = len([timestamp for timestamp in restarts if timestamp >= now - FLAP_WINDOW])
+
+        return {
+            ATTR_UPTIME: round(on_time / known_time * 100, 1) if known_time > 0 else None,
+            ATTR_RESTARTS: len(restarts),
+            ATTR_FAILURES: failures,
+            ATTR_MTTR: round(sum(downtimes) / len(downtimes), 1) if len(downtimes) > 0 else None,
+            ATTR_FLAPPING: flaps >= FLAP_THRESHOLD,
+        }
+
+    def as_list(self) -> list:
+        return [[timestamp, state_name(code), result] for timestamp, code, result in self.entries()]
+
+    @classmethod
+    def from_list(cls, entries: list, capacity: int = HISTORY_SIZE) -> "Timeline":
+        timeline = cls(capacity)
+
+        for timestamp, state, result in entries:
+            timeline.append(state, result, timestamp)
+
+        return timeline
+
+class History(object):
+    def __init__(self, capacity: int = HISTORY_SIZE) -> None:
+        self._capacity: int = capacity
+        self._timelines: dict = {}
+
+    def record(self, unit_name: str, state: str, result: Optional[int] = None, timestamp: Optional[float] = None) -> bool:
+        timeline = self._timelines.get(unit_name)
+        if timeline is None:
+            timeline = self._timelines[unit_name] = Timeline(self._capacity)
+
+        return timeline.append(state, result, timestamp)
+
+    def restore(self, unit_name: str, entries: list) -> None:
+        self._timelines[unit_name] = Timeline.from_list(entries, self._capacity)
+
+    def get(self, unit_name: str) -> Optional[Timeline]:
+        return self._timelines.get(unit_name)
+
+    def stats(self, unit_name: str, on_states: frozenset, now: Optional[float] = None) -> dict:
+        timeline = self._timelines.get(unit_name)
+        if timeline is None:
+            return {}
+
+        return timeline.stats(on_states, now = now)
+
+    def retain(self, unit_names: set) -> None:
+        for unit_name in [name for name in self._timelines if name not in unit_names]:
+            del self._timelines[unit_name]
@@ -0,0 +1,248 @@
+import logging
+import asyncio
+
+from collections import deque
+from typing import Optional, Callable
+
+try:
+    from systemd import journal
+except ImportError:
+    journal = None
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    DEFAULT_JOURNAL_SIZE,
+    JOURNAL_BATCH_SIZE,
+    JOURNAL_MESSAGE_SIZE,
+    JOURNAL_UNIT_FIELD
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+class Journal(object):
+    def __init__(self, hass: HomeAssistant, size: int = DEFAULT_JOURNAL_SIZE) -> None:
+        self.hass = hass
+
+        self._size: int = size
+        self._reader = None
+        self._units: set = set()
+        self._buffers: dict = {}
+        self._listeners: dict = {}
+        self._lock: asyncio.Lock = asyncio.Lock()
+        self._is_reading: bool = False
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def is_started(self) -> bool:
+        return self._reader is not None
+
+    def has(self, unit_name: str) -> bool:
+        return unit_name in self._buffers
+
+    def get(self, unit_name: str, lines: Optional[int] = None) -> list:
+        entries = list(self._buffers.get(unit_name, []))
+
+        return entries[-lines:] if lines else entries
+
+    @callback
+    def async_subscribe(self, unit_name: str, listener: Callable) -> Callable:
+        listeners = self._listeners.setdefault(unit_name, [])
+        listeners.append(listener)
+
+        @callback
+        def unsubscribe() -> None:
+            listeners.remove(listener)
+
+            if len(listeners) == 0:
+                self._listeners.pop(unit_name, None)
+
+        return unsubscribe
+
+    async def async_start(self) -> bool:
+        if journal is None:
+            _LOGGER.warning('Systemd Manager: python-systemd is not installed, the journal is not available')
+
+            return False
+
+        try:
+            self._reader = await self.hass.async_add_executor_job(journal.Reader, journal.SYSTEM_ONLY)
+        except OSError as e:
+            _LOGGER.error('Systemd Manager (Journal): %r', e)
+
+            return False
+
+        return True
+
+    async def async_stop(self) -> None:
+        if self._reader is None:
+            return
+
+        self.hass.loop.remove_reader(self._reader.fileno())
+
+        reader, self._reader = self._reader, None
+
+        async with self._lock:
+            await self.hass.async_add_executor_job(reader.close)
+
+        self._buffers = {}
+        self._units = set()
+
+    async def async_watch(self, unit_names: list) -> None:
+        if self._reader is None or set(unit_names) == self._units:
+            return
+
+        added = [unit_name for unit_name in unit_names if unit_name not in self._units]
+
+        self._units = set(unit_names)
+
+        async with self._lock:
+            if self._reader is None:
+                return
+
+            entries, backfill = await self.hass.async_add_executor_job(self._set_matches, list(self._units), added)
+
+        for unit_name, entry in entries:
+            self._append(unit_name, entry)
+
+        for unit_name in [name for name in self._buffers if name not in self._units]:
+            del self._buffers[unit_name]
+
+        for unit_name in added:
+            self._buffers[unit_name] = deque(backfill.get(unit_name, []), maxlen = self._size)
+
+        self._listen()
+
+    def _set_matches(self, unit_names: list, added: list) -> tuple:
+        entries = self._read()[0] if len(self._buffers) > 0 else []
+        backfill = self._backfill(added)
+
+        self._reader.flush_matches()
+
+        for unit_name in unit_names:
+            self._reader.add_match(**{JOURNAL_UNIT_FIELD: unit_name})
+
+        self._reader.this_boot()
+        self._reader.seek_tail()
+        self._reader.get_previous()
+
+        return entries, backfill
+
+    async def async_read(self, unit_name: str, lines: Optional[int] = None) -> list:
+        if self._reader is None:
+            return []
+
+        entries = await self.hass.async_add_executor_job(self._backfill, [unit_name], lines)
+
+        return entries.get(unit_name, [])
+
+    def _backfill(self, unit_names: list, size: Optional[int] = None) -> dict:
+        if len(unit_names) == 0:
+            return {}
+
+        size = size or self._size
+
+        entries = {unit_name: [] for unit_name in unit_names}
+
+        reader = journal.Reader(journal.SYSTEM_ONLY)
+
+        try:
+            for unit_name in unit_names:
+                reader.add_match(**{JOURNAL_UNIT_FIELD: unit_name})
+
+            reader.this_boot()
+            reader.seek_tail()
+
+            for _ in range(size * len(unit_names)):
+                entry = reader.get_previous()
+                if not entry:
+                    break
+
+                unit_entries = entries.get(entry.get(JOURNAL_UNIT_FIELD))
+                if unit_entries is not None and len(unit_entries) < size:
+                    unit_entries.append(self._parse(entry))
+        finally:
+            reader.close()
+
+        return {unit_name: unit_entries[::-1] for unit_name, unit_entries in entries.items()}
+
+    def _read(self) -> tuple:
+        self._reader.process()
+
+        entries = []
+
+        for _ in range(JOURNAL_BATCH_SIZE):
+            entry = self._reader.get_next()
+            if not entry:
+                return entries, False
+
+            entries.append((entry.get(JOURNAL_UNIT_FIELD), self._parse(entry)))
+
+        return entries, True
+
+    @staticmethod
+    def _parse(entry: dict) -> dict:
+        timestamp = entry.get("__REALTIME_TIMESTAMP")
+        message = entry.get("MESSAGE", "")
+
+        if isinstance(message, bytes):
+            message = message.decode("utf-8", "replace")
+
+        return {
+            "timestamp": timestamp.isoformat() if timestamp is not None else None,
+            "priority": entry.get("PRIORITY"),
+            "message": str(message)[:JOURNAL_MESSAGE_SIZE],
+        }
+
+    @callback
+    def _listen(self) -> None:
+        if self._reader is None or self._is_reading:
+            return
+
+        if len(self._units) > 0:
+            self.hass.loop.add_reader(self._reader.fileno(), self._on_readable)
+        else:
+            self.hass.loop.remove_reader(self._reader.fileno())
+
+    @callback
+    def _on_readable(self) -> None:
+        if self._is_reading or self._reader is None:
+            return
+
+        self._is_reading = True
+        self.hass.loop.remove_reader(self._reader.fileno())
+        self.hass.async_create_task(self._async_read())
+
+    async def _async_read(self) -> None:
+        reader = self._reader
+        has_more = True
+
+        try:
+            while has_more:
+                async with self._lock:
+                    if reader is not self._reader:
+                        break
+
+                    entries, has_more = await self.hass.async_add_executor_job(self._read)
+
+                for unit_name, entry in entries:
+                    self._append(unit_name, entry)
+        except OSError as e:
+            _LOGGER.error('Systemd Manager (Journal): %r', e)
+        finally:
+            self._is_reading = False
+            self._listen()
+
+    @callback
+    def _append(self, unit_name: Optional[str], entry: dict) -> None:
+        buffer = self._buffers.get(unit_name)
+        if buffer is None:
+            return
+
+        buffer.append(entry)
+
+        for listener in list(self._listeners.get(unit_name, [])):
+            listener(entry)
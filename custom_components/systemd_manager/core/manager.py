@@ -1,34 +1,115 @@
+import os
 import logging
-import datetime
+import threading
+import functools
 import dbus
 import dbus.mainloop.glib
 dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
 
-from typing import Optional
-from enum import Enum
-from .const import UNIT_INTERFACE, SERVICE_UNIT_INTERFACE
+try:
+    from gi.repository import GLib
+except ImportError:
+    GLib = None
+
+from typing import Optional, Callable
+from .base import BaseManager, Mode, split_patterns
+from .cache import LruCache
+from .metrics import Metrics
+from .units import UNIT_SUFFIXES
+from .const import (
+    DBUS_BUS_NAME,
+    DBUS_INTERFACE,
+    SYSTEMD_BUS_NAME,
+    SYSTEMD_OBJECT_PATH,
+    MANAGER_INTERFACE,
+    PROPERTIES_INTERFACE,
+    UNIT_INTERFACE,
+    SERVICE_UNIT_INTERFACE,
+    UNIT_CACHE_SIZE,
+    STALE_ERRORS,
+    DISCONNECT_ERRORS,
+    UNKNOWN_PROPERTY_ERRORS,
+    UNKNOWN_METHOD_ERROR,
+    EVENT_UNIT_CHANGED,
+    EVENT_UNIT_NEW,
+    EVENT_UNIT_REMOVED,
+    EVENT_JOB_REMOVED,
+    EVENT_UNIT_FILES_CHANGED,
+    EVENT_RELOADED,
+    EVENT_CONNECTED,
+    EVENT_DISCONNECTED
+)
 
 _LOGGER = logging.getLogger(__name__)
 
-class Mode(Enum):
-    REPLACE = "replace"
-    FAIL = "fail"
-    ISOLATE = "isolate"
-    IGNORE_DEPENDENCIES = "ignore-dependencies"
-    IGNORE_REQUIREMENTS = "ignore-requirements"
+def _to_variant(signature: str, value):
+    if signature == "a(sasb)":
+        return dbus.Array([
+            dbus.Struct((path, dbus.Array(argv, signature = 's'), dbus.Boolean(ignore))) for path, argv, ignore in value
+        ], signature = '(sasb)', variant_level = 1)
 
+    return {"s": dbus.String, "b": dbus.Boolean, "t": dbus.UInt64}[signature](value, variant_level = 1)
 
-class Manager(object):
-    def __init__(self):
-        self._bus = dbus.SystemBus()
+class InstrumentedInterface(object):
+    def __init__(self, interface: dbus.Interface, metrics: Metrics) -> None:
+        self._interface = interface
+        self._metrics = metrics
 
-    def list(self) -> dict:
+    def __getattr__(self, member: str):
+        attribute = getattr(self._interface, member)
+
+        if not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            with self._metrics.measure(member):
+                return attribute(*args, **kwargs)
+
+        return call
+
+class Manager(BaseManager):
+    def __init__(self, address: Optional[str] = None, metrics: Optional[Metrics] = None):
+        try:
+            self._bus = dbus.bus.BusConnection(address) if address else dbus.SystemBus(private = True)
+        except dbus.exceptions.DBusException as e:
+            raise ConnectionError(str(e)) from e
+
+        self._bus.set_exit_on_disconnect(False)
+        self._bus.call_on_disconnection(self._on_disconnected)
+
+        self._is_connected: bool = True
+        self._interface = None
+        self._units: LruCache = LruCache(UNIT_CACHE_SIZE)
+
+        self.metrics: Metrics = metrics if metrics is not None else Metrics()
+
+        self._bus.add_signal_receiver(
+            self._on_name_owner_changed,
+            signal_name = "NameOwnerChanged",
+            dbus_interface = DBUS_INTERFACE,
+            bus_name = DBUS_BUS_NAME,
+            arg0 = SYSTEMD_BUS_NAME
+        )
+
+        self._callback: Optional[Callable] = None
+        self._signals: list = []
+        self._watches: dict = {}
+        self._loop = None
+        self._loop_thread: Optional[threading.Thread] = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self._is_connected
+
+    def list(self, unit_names: Optional[list] = None) -> dict:
         services = {}
 
-        for unit in self._list_units():
+        units = self._list_units() if unit_names is None else self._list_units_by_names(unit_names)
+
+        for unit in units or []:
             unit_name = str(unit[0]).strip()
 
-            if not unit_name.endswith('.service') or unit_name in services:
+            if (unit_names is None and not unit_name.endswith(UNIT_SUFFIXES)) or unit_name in services or str(unit[2]) == 'not-found':
                 _LOGGER.debug('Systemd Manager {}'.format(unit_name))
 
                 continue
@@ -37,81 +118,361 @@ class Manager(object):
 
         return services
 
-    def start(self, unit_name: str, mode: Mode = Mode.REPLACE) -> bool:
+    def list_units_details(self, unit_names: Optional[list] = None) -> Optional[dict]:
+        units = self._list_units() if unit_names is None else self._list_units_by_names(unit_names)
+
+        if units is None:
+            return None
+
+        return {
+            str(unit[0]): {"description": str(unit[1]), "state": str(unit[4])}
+            for unit in units if str(unit[2]) != 'not-found'
+        }
+
+    def list_unit_files(self, patterns: Optional[list] = None) -> Optional[dict]:
+        if patterns is not None and len(patterns) == 0:
+            return {}
+
         interface = self._get_interface()
 
         if interface is None:
-            return False
+            return None
 
         try:
-            interface.StartUnit(unit_name, mode.value)
+            unit_files = interface.ListUnitFiles() if patterns is None else interface.ListUnitFilesByPatterns([], patterns)
         except dbus.exceptions.DBusException as e:
-            _LOGGER.error('Systemd Manager (DBus): %r', e)
+            self._on_error(e)
 
-            return False
+            return None
 
-        return True
+        return {os.path.basename(str(path)): str(state) for path, state in unit_files}
+
+    def start(self, unit_name: str, mode: Mode = Mode.REPLACE) -> Optional[str]:
+        interface = self._get_interface()
+
+        if interface is None:
+            return None
 
-    def stop(self, unit_name: str, mode: Mode = Mode.REPLACE) -> bool:
+        try:
+            return str(interface.StartUnit(unit_name, mode.value))
+        except dbus.exceptions.DBusException as e:
+            self._on_error(e)
+
+            return None
+
+    def stop(self, unit_name: str, mode: Mode = Mode.REPLACE) -> Optional[str]:
+        interface = self._get_interface()
+
+        if interface is None:
+            return None
+
+        try:
+            return str(interface.StopUnit(unit_name, mode.value))
+        except dbus.exceptions.DBusException as e:
+            self._on_error(e)
+
+            return None
+
+    def restart(self, unit_name: str, mode: Mode = Mode.REPLACE) -> Optional[str]:
+        interface = self._get_interface()
+
+        if interface is None:
+            return None
+
+        try:
+            return str(interface.RestartUnit(unit_name, mode.value))
+        except dbus.exceptions.DBusException as e:
+            self._on_error(e)
+
+            return None
+
+    def enable(self, unit_names: list) -> bool:
         interface = self._get_interface()
 
         if interface is None:
             return False
 
         try:
-            interface.StopUnit(unit_name, mode.value)
+            interface.EnableUnitFiles(dbus.Array(unit_names, signature = 's'), dbus.Boolean(False), dbus.Boolean(True))
         except dbus.exceptions.DBusException as e:
-            _LOGGER.error('Systemd Manager (DBus): %r', e)
+            self._on_error(e)
 
             return False
 
         return True
 
-    def restart(self, unit_name: str, mode: Mode = Mode.REPLACE):
+    def disable(self, unit_names: list) -> bool:
         interface = self._get_interface()
 
         if interface is None:
             return False
 
         try:
-            interface.RestartUnit(unit_name, mode.value)
+            interface.DisableUnitFiles(dbus.Array(unit_names, signature = 's'), dbus.Boolean(False))
         except dbus.exceptions.DBusException as e:
-            _LOGGER.error('Systemd Manager (DBus): %r', e)
+            self._on_error(e)
 
             return False
 
         return True
 
-    def enable(self, unit_name: str) -> bool:
+    def start_transient(self, unit_name: str, properties: list, mode: Mode = Mode.FAIL) -> Optional[str]:
+        interface = self._get_interface()
+
+        if interface is None:
+            return None
+
+        try:
+            return str(interface.StartTransientUnit(
+                unit_name,
+                mode.value,
+                dbus.Array([
+                    dbus.Struct((name, _to_variant(signature, value))) for name, signature, value in properties
+                ], signature = '(sv)'),
+                dbus.Array([], signature = '(sa(sv))')
+            ))
+        except dbus.exceptions.DBusException as e:
+            self._on_error(e)
+
+            return None
+
+    def reset_failed(self, unit_name: str) -> bool:
         interface = self._get_interface()
 
         if interface is None:
             return False
 
         try:
-            interface.EnableUnitFiles([unit_name], dbus.Boolean(False), dbus.Boolean(True))
+            interface.ResetFailedUnit(unit_name)
         except dbus.exceptions.DBusException as e:
-            _LOGGER.error('Systemd Manager (DBus): %r', e)
+            self._on_error(e, False)
 
             return False
 
         return True
 
-    def disable(self, unit_name: str) -> bool:
+    def subscribe(self, callback: Callable) -> bool:
+        if GLib is None:
+            _LOGGER.warning('Systemd Manager: PyGObject is not installed, push mode is not available')
+
+            return False
+
         interface = self._get_interface()
 
         if interface is None:
             return False
 
         try:
-            interface.DisableUnitFiles([unit_name], dbus.Boolean(False))
-        except dbus.exceptions.DBusException as error:
-            _LOGGER.error('Systemd Manager (DBus): %r', e)
+            interface.Subscribe()
+        except dbus.exceptions.DBusException as e:
+            self._on_error(e)
 
             return False
 
+        self._callback = callback
+
+        for signal_name, handler in [
+            ("UnitNew", self._on_unit_new),
+            ("UnitRemoved", self._on_unit_removed),
+            ("JobRemoved", self._on_job_removed),
+            ("UnitFilesChanged", self._on_unit_files_changed),
+            ("Reloading", self._on_reloading)
+        ]:
+            self._signals.append(self._bus.add_signal_receiver(
+                handler,
+                signal_name = signal_name,
+                dbus_interface = MANAGER_INTERFACE,
+                bus_name = SYSTEMD_BUS_NAME,
+                path = SYSTEMD_OBJECT_PATH
+            ))
+
+        self._start_loop()
+
         return True
 
+    def watch(self, unit_names: list) -> None:
+        if self._callback is None:
+            return
+
+        for unit_name in unit_names:
+            if unit_name in self._watches:
+                continue
+
+            unit_path = self._get_unit_path(unit_name)
+            if unit_path is None:
+                continue
+
+            self._watches[unit_name] = self._bus.add_signal_receiver(
+                functools.partial(self._on_properties_changed, unit_name),
+                signal_name = "PropertiesChanged",
+                dbus_interface = PROPERTIES_INTERFACE,
+                bus_name = SYSTEMD_BUS_NAME,
+                path = unit_path
+            )
+
+        unit_names = set(unit_names)
+        for unit_name in [name for name in self._watches if name not in unit_names]:
+            self._watches.pop(unit_name).remove()
+
+    def unsubscribe(self) -> None:
+        if self._callback is None:
+            return
+
+        for match in self._signals + list(self._watches.values()):
+            match.remove()
+
+        self._signals = []
+        self._watches = {}
+        self._callback = None
+
+        interface = self._get_interface()
+
+        if interface is not None:
+            try:
+                interface.Unsubscribe()
+            except dbus.exceptions.DBusException as e:
+                self._on_error(e, False)
+
+        if self._loop is not None:
+            self._loop.quit()
+
+        self._loop = None
+        self._loop_thread = None
+
+    def close(self) -> None:
+        for match in self._signals + list(self._watches.values()):
+            try:
+                match.remove()
+            except dbus.exceptions.DBusException as e:
+                _LOGGER.debug('Systemd Manager: unable to remove signal match: %r', e)
+
+        self._signals = []
+        self._watches = {}
+        self._callback = None
+
+        if self._loop is not None:
+            self._loop.quit()
+
+        self._loop = None
+        self._loop_thread = None
+
+        self.invalidate()
+        self._bus.close()
+
+    def _start_loop(self) -> None:
+        if self._loop_thread is not None:
+            return
+
+        self._loop = GLib.MainLoop()
+        self._loop_thread = threading.Thread(target = self._loop.run, name = "systemd_manager", daemon = True)
+        self._loop_thread.start()
+
+    def _on_unit_new(self, unit_name, unit_path) -> None:
+        self._callback(EVENT_UNIT_NEW, str(unit_name), {})
+
+    def _on_unit_removed(self, unit_name, unit_path) -> None:
+        self._units.pop(str(unit_name))
+
+        match = self._watches.pop(str(unit_name), None)
+        if match is not None:
+            match.remove()
+
+        self._callback(EVENT_UNIT_REMOVED, str(unit_name), {})
+
+    def _on_job_removed(self, job_id, job_path, unit_name, result) -> None:
+        self._callback(EVENT_JOB_REMOVED, str(unit_name), {"job": str(job_path), "result": str(result)})
+
+    def _on_unit_files_changed(self) -> None:
+        self._callback(EVENT_UNIT_FILES_CHANGED, "", {})
+
+    def _on_reloading(self, active) -> None:
+        if not active:
+            self._callback(EVENT_RELOADED, "", {})
+
+    def _on_properties_changed(self, unit_name: str, interface_name, changed, invalidated) -> None:
+        if str(interface_name) != UNIT_INTERFACE:
+            return
+
+        self._callback(EVENT_UNIT_CHANGED, unit_name, {str(key): value for key, value in changed.items()})
+
+    def _on_name_owner_changed(self, name, old_owner, new_owner) -> None:
+        _LOGGER.debug('Systemd Manager: %s owner changed, dropping cached proxies', name)
+
+        self.invalidate()
+        self._is_connected = bool(new_owner)
+
+        if self._callback is not None:
+            self._callback(EVENT_CONNECTED if new_owner else EVENT_DISCONNECTED, str(name), {})
+
+    def _on_disconnected(self, connection) -> None:
+        _LOGGER.debug('Systemd Manager: D-Bus connection closed')
+
+        self._is_connected = False
+
+        if self._callback is not None:
+            self._callback(EVENT_DISCONNECTED, SYSTEMD_BUS_NAME, {})
+
+    def _on_error(self, error: dbus.exceptions.DBusException, with_error: bool = True) -> None:
+        if error.get_dbus_name() in STALE_ERRORS:
+            self.invalidate()
+
+        if error.get_dbus_name() in DISCONNECT_ERRORS:
+            self._is_connected = False
+
+            _LOGGER.debug('Systemd Manager (DBus): %r', error)
+
+            return
+
+        if with_error:
+            _LOGGER.error('Systemd Manager (DBus): %r', error)
+
+    def invalidate(self) -> None:
+        self._interface = None
+        self._units.clear()
+
+    def get_unit_paths(self) -> dict:
+        return {unit_name: str(interface.object_path) for unit_name, interface in self._units.items()}
+
+    def preload(self, unit_paths: dict) -> None:
+        try:
+            owner = self._bus.get_name_owner(SYSTEMD_BUS_NAME)
+
+            for unit_name, unit_path in unit_paths.items():
+                if unit_name in self._units:
+                    continue
+
+                obj = self._bus.get_object(owner, unit_path, introspect = False)
+                self._units.set(unit_name, InstrumentedInterface(dbus.Interface(obj, PROPERTIES_INTERFACE), self.metrics))
+        except dbus.exceptions.DBusException as e:
+            self._on_error(e)
+
+    def _get_unit_path(self, unit_name: str) -> Optional[str]:
+        properties_interface = self._get_properties_interface(unit_name)
+
+        return str(properties_interface.object_path) if properties_interface is not None else None
+
+    def _get_properties_interface(self, unit_name: str):
+        properties_interface = self._units.get(unit_name)
+        if properties_interface is not None:
+            return properties_interface
+
+        interface = self._get_interface()
+
+        if interface is None:
+            return None
+
+        try:
+            obj = self._bus.get_object(SYSTEMD_BUS_NAME, interface.LoadUnit(unit_name), introspect = False)
+        except dbus.exceptions.DBusException as e:
+            self._on_error(e)
+
+            return None
+
+        properties_interface = InstrumentedInterface(dbus.Interface(obj, PROPERTIES_INTERFACE), self.metrics)
+        self._units.set(unit_name, properties_interface)
+
+        return properties_interface
+
     def _get_state(self, unit_name: str, with_error: bool = True) -> Optional[str]:
         interface = self._get_interface()
 
@@ -121,8 +482,7 @@ class Manager(object):
         try:
             return interface.GetUnitFileState(unit_name)
         except dbus.exceptions.DBusException as e:
-            if with_error:
-                _LOGGER.error('Systemd Manager (DBus): %r', e)
+            self._on_error(e, with_error)
 
             return None
 
@@ -135,17 +495,49 @@ class Manager(object):
         try:
             return interface.ListUnits()
         except dbus.exceptions.DBusException as e:
-            _LOGGER.error('Systemd Manager (DBus): %r', e)
+            self._on_error(e)
 
             return None
 
+    def _list_units_by_names(self, unit_names: list) -> Optional[list]:
+        interface = self._get_interface()
+
+        if interface is None:
+            return None
+
+        names, patterns = split_patterns(unit_names)
+        units = []
+
+        try:
+            if len(names) > 0:
+                units += interface.ListUnitsByNames(names)
+
+            if len(patterns) > 0:
+                units += interface.ListUnitsByPatterns(dbus.Array([], signature = 's'), patterns)
+        except dbus.exceptions.DBusException as e:
+            if e.get_dbus_name() != UNKNOWN_METHOD_ERROR:
+                self._on_error(e)
+
+                return None
+
+            _LOGGER.debug('Systemd Manager: ListUnitsByNames is not supported, falling back to ListUnits')
+
+            return self._list_units()
+
+        return units
+
     def _get_interface(self):
+        if self._interface is not None:
+            return self._interface
+
         try:
-            obj = self._bus.get_object("org.freedesktop.systemd1", "/org/freedesktop/systemd1")
+            obj = self._bus.get_object(SYSTEMD_BUS_NAME, SYSTEMD_OBJECT_PATH)
 
-            return dbus.Interface(obj, "org.freedesktop.systemd1.Manager")
+            self._interface = InstrumentedInterface(dbus.Interface(obj, MANAGER_INTERFACE), self.metrics)
+
+            return self._interface
         except dbus.exceptions.DBusException as e:
-            _LOGGER.error('Systemd Manager (DBus): %r', e)
+            self._on_error(e)
 
             return None
 
@@ -179,62 +571,51 @@ class Manager(object):
 
         return self.get_exec_status(service_properties)
 
-    def get_exec_status(self, properties: Optional[dict] = None) -> Optional[int]:
-        try:
-            return int(properties["ExecMainStatus"])
-        except KeyError as e:
-            _LOGGER.error('Systemd Manager (DBus): %r', e)
+    def get_unit_properties(self, unit_name: str, unit_interface):
+        properties_interface = self._get_properties_interface(unit_name)
 
+        if properties_interface is None:
             return None
 
-    def get_type(self, properties: Optional[dict] = None) -> Optional[str]:
         try:
-            return str(properties["Type"])
-        except KeyError as e:
-            _LOGGER.error('Systemd Manager (DBus): %r', e)
+            return properties_interface.GetAll(unit_interface)
+        except dbus.exceptions.DBusException as e:
+            self._units.pop(unit_name)
+            self._on_error(e)
 
             return None
 
-    def get_last_activity(self, properties: Optional[dict] = None) -> Optional[str]:
-        try:
-            return datetime.datetime \
-                .utcfromtimestamp(int(properties["StateChangeTimestamp"]) / 1000000) \
-                .strftime('%Y-%m-%d %H:%M:%S')
-        except KeyError as e:
-            _LOGGER.error('Systemd Manager (DBus): %r', e)
+    def get_units_properties(self, unit_names: list, unit_properties: dict) -> dict:
+        properties = {}
 
-            return None
+        for unit_name in unit_names:
+            properties_interface = self._get_properties_interface(unit_name)
 
-    def get_triggered_by(self, properties: Optional[dict] = None) -> Optional[str]:
-        try:
-            return ', '.join(list(properties["TriggeredBy"]))
-        except KeyError as e:
-            _LOGGER.error('Systemd Manager (DBus): %r', e)
+            if properties_interface is None:
+                continue
 
-            return None
+            properties[unit_name] = self._get_properties(unit_name, properties_interface, unit_properties)
 
-    def get_result(self, properties: Optional[dict] = None) -> Optional[str]:
-        try:
-            return properties["Result"].encode("utf-8")
-        except KeyError as e:
-            _LOGGER.error('Systemd Manager (DBus): %r', e)
+        return properties
 
-            return None
+    def _get_properties(self, unit_name: str, properties_interface, unit_properties: dict) -> dict:
+        properties = {}
 
-    def get_unit_properties(self, unit_name: str, unit_interface):
-        interface = self._get_interface()
+        for unit_interface, names in unit_properties.items():
+            try:
+                values = properties_interface.GetAll(unit_interface)
+            except dbus.exceptions.DBusException as e:
+                if e.get_dbus_name() in UNKNOWN_PROPERTY_ERRORS:
+                    continue
 
-        if interface is None:
-            return None
+                self._units.pop(unit_name)
+                self._on_error(e)
 
-        try:
-            unit_path = interface.LoadUnit(unit_name)
-            obj = self._bus.get_object("org.freedesktop.systemd1", unit_path)
+                return properties
 
-            properties_interface = dbus.Interface(obj, "org.freedesktop.DBus.Properties")
+            values = {name: values[name] for name in names if name in values}
 
-            return properties_interface.GetAll(unit_interface)
-        except dbus.exceptions.DBusException as e:
-            _LOGGER.error('Systemd Manager (DBus): %r', e)
+            if len(values) > 0:
+                properties[unit_interface] = values
 
-            return None
\ No newline at end of file
+        return properties
@@ -0,0 +1,137 @@
+import time
+import threading
+
+from contextlib import contextmanager
+from typing import Optional
+
+from .const import METRICS_BUCKETS
+
+class Histogram(object):
+    def __init__(self, buckets: list) -> None:
+        self._buckets: list = buckets
+        self._counts: list = [0] * (len(buckets) + 1)
+
+        self.count: int = 0
+        self.errors: int = 0
+        self.total: float = 0.0
+        self.last: float = 0.0
+        self.max: float = 0.0
+
+    def observe(self, value: float, is_error: bool = False) -> None:
+        index = 0
+        while index < len(self._buckets) and value > self._buckets[index]:
+            index += 1
+
+        self._counts[index] += 1
+
+        self.count += 1
+        self.errors += int(is_error)
+        self.total += value
+        self.last = value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+
+        rank = self.count * percent / 100
+        seen = 0
+
+        for index, count in enumerate(self._counts):
+            seen += count
+
+            if seen >= rank:
+                return self._buckets[index] if index < len(self._buckets) else self.max
+
+        return self.max
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total": round(self.total, 6),
+            "last": round(self.last, 6),
+            "max": round(self.max, 6),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": dict(zip([str(bucket) for bucket in self._buckets] + ["+Inf"], self._counts)),
+        }
+
+class StepTimer(object):
+    def __init__(self, coroutine) -> None:
+        self._coroutine = coroutine
+
+        self.elapsed: float = 0.0
+
+    def __await__(self):
+        value, error = None, None
+
+        while True:
+            started = time.perf_counter()
+
+            try:
+                future = self._coroutine.send(value) if error is None else self._coroutine.throw(error)
+            except StopIteration as e:
+                self.elapsed += time.perf_counter() - started
+
+                return e.value
+            except BaseException:
+                self.elapsed += time.perf_counter() - started
+
+                raise
+
+            self.elapsed += time.perf_counter() - started
+
+            try:
+                value, error = (yield future), None
+            except BaseException as e:
+                value, error = None, e
+
+class Metrics(object):
+    def __init__(self) -> None:
+        self._histograms: dict = {}
+        self._counters: dict = {}
+        self._lock = threading.Lock()
+
+    @property
+    def histograms(self) -> dict:
+        return self._histograms
+
+    @property
+    def counters(self) -> dict:
+        return self._counters
+
+    @contextmanager
+    def measure(self, name: str):
+        started = time.perf_counter()
+
+        try:
+            yield
+        except Exception:
+            self.observe(name, time.perf_counter() - started, True)
+
+            raise
+
+        self.observe(name, time.perf_counter() - started)
+
+    def observe(self, name: str, value: float, is_error: bool = False) -> None:
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(METRICS_BUCKETS)
+
+            self._histograms[name].observe(value, is_error)
+
+    def increment(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def get(self, name: str) -> Optional[Histogram]:
+        return self._histograms.get(name)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "histograms": {name: histogram.as_dict() for name, histogram in self._histograms.items()},
+                "counters": dict(self._counters),
+            }
@@ -0,0 +1,262 @@
+import os
+import sys
+import json
+import time
+import logging
+import asyncio
+
+from typing import Optional, Callable
+
+from .base import BaseManager, Mode
+from .metrics import Metrics
+from .const import (
+    SYSTEMD_BUS_NAME,
+    PROPERTIES_BATCH_SIZE,
+    HELPER_TIMEOUT,
+    HELPER_BUFFER_SIZE,
+    EVENT_DISCONNECTED
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+HELPER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "helper.py")
+
+def _encode(value):
+    return value.value if isinstance(value, Mode) else str(value)
+
+class ProcessManager(BaseManager):
+    def __init__(self, address: Optional[str] = None, metrics: Optional[Metrics] = None) -> None:
+        self._address: Optional[str] = address
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._requests: dict = {}
+        self._request_id: int = 0
+        self._is_connected: bool = False
+        self._is_closing: bool = False
+        self._callback: Optional[Callable] = None
+
+        self.metrics: Metrics = metrics if metrics is not None else Metrics()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._is_connected
+
+    async def async_connect(self) -> bool:
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                sys.executable, HELPER_PATH, self._address or "",
+                stdin = asyncio.subprocess.PIPE,
+                stdout = asyncio.subprocess.PIPE,
+                limit = HELPER_BUFFER_SIZE
+            )
+        except OSError as e:
+            _LOGGER.error('Systemd Manager (Helper): %r', e)
+
+            return False
+
+        try:
+            line = await asyncio.wait_for(self._process.stdout.readline(), HELPER_TIMEOUT)
+            message = json.loads(line) if line else {"error": "the helper process exited"}
+        except (asyncio.TimeoutError, ValueError) as e:
+            message = {"error": repr(e)}
+
+        if not message.get("ready"):
+            _LOGGER.error('Systemd Manager (Helper): %s', message.get("error"))
+
+            await self._async_stop_process()
+
+            return False
+
+        _LOGGER.debug('Systemd Manager (Helper): started with pid %s', message.get("pid"))
+
+        self._is_connected = True
+        self._reader = asyncio.get_running_loop().create_task(self._async_read())
+
+        return True
+
+    async def async_close(self) -> None:
+        self._is_closing = True
+        self._callback = None
+
+        if self._process is not None and self._process.returncode is None:
+            try:
+                self._process.stdin.write(b'{"method":"close"}\n')
+                await self._process.stdin.drain()
+            except OSError as e:
+                _LOGGER.debug('Systemd Manager (Helper): %r', e)
+
+        await self._async_stop_process()
+
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+
+        self._is_connected = False
+
+    def get_unit_paths(self) -> dict:
+        return {}
+
+    async def async_preload(self, unit_paths: dict) -> None:
+        await self._async_request("preload", unit_paths)
+
+    async def async_list(self, unit_names: Optional[list] = None) -> dict:
+        return await self._async_request("list", unit_names) or {}
+
+    async def async_list_units_details(self, unit_names: Optional[list] = None) -> Optional[dict]:
+        return await self._async_request("list_units_details", unit_names)
+
+    async def async_list_unit_files(self, patterns: Optional[list] = None) -> Optional[dict]:
+        return await self._async_request("list_unit_files", patterns)
+
+    async def async_start(self, unit_name: str, mode: Mode = Mode.REPLACE) -> Optional[str]:
+        return await self._async_request("start", unit_name, mode)
+
+    async def async_stop(self, unit_name: str, mode: Mode = Mode.REPLACE) -> Optional[str]:
+        return await self._async_request("stop", unit_name, mode)
+
+    async def async_restart(self, unit_name: str, mode: Mode = Mode.REPLACE) -> Optional[str]:
+        return await self._async_request("restart", unit_name, mode)
+
+    async def async_enable(self, unit_names: list) -> bool:
+        return bool(await self._async_request("enable", unit_names))
+
+    async def async_disable(self, unit_names: list) -> bool:
+        return bool(await self._async_request("disable", unit_names))
+
+    async def async_is_available(self, unit_name: str) -> bool:
+        return bool(await self._async_request("is_available", unit_name))
+
+    async def async_start_transient(self, unit_name: str, properties: list, mode: Mode = Mode.FAIL) -> Optional[str]:
+        return await self._async_request("start_transient", unit_name, properties, mode)
+
+    async def async_reset_failed(self, unit_name: str) -> bool:
+        return bool(await self._async_request("reset_failed", unit_name))
+
+    async def async_get_units_properties(self, unit_names: list, unit_properties: dict) -> dict:
+        results = await asyncio.gather(*[
+            self._async_request("get_units_properties", unit_names[index:index + PROPERTIES_BATCH_SIZE], unit_properties)
+            for index in range(0, len(unit_names), PROPERTIES_BATCH_SIZE)
+        ])
+
+        properties = {}
+        for result in results:
+            properties |= result or {}
+
+        return properties
+
+    async def async_subscribe(self, callback: Callable) -> bool:
+        self._callback = callback
+
+        if not await self._async_request("subscribe"):
+            self._callback = None
+
+            return False
+
+        return True
+
+    async def async_watch(self, unit_names: list) -> None:
+        await self._async_request("watch", unit_names)
+
+    async def async_unsubscribe(self) -> None:
+        await self._async_request("unsubscribe")
+
+        self._callback = None
+
+    async def _async_request(self, method: str, *args) -> Optional[object]:
+        if self._process is None or self._process.returncode is not None:
+            self._is_connected = False
+
+            return None
+
+        self._request_id += 1
+
+        request_id = self._request_id
+        future = self._requests[request_id] = asyncio.get_running_loop().create_future()
+        started = time.perf_counter()
+
+        try:
+            self._process.stdin.write(self._encode_request(request_id, method, list(args)))
+            await self._process.stdin.drain()
+
+            message = await asyncio.wait_for(future, HELPER_TIMEOUT)
+        except (OSError, asyncio.TimeoutError) as e:
+            self._requests.pop(request_id, None)
+            self.metrics.observe(method, time.perf_counter() - started, True)
+
+            _LOGGER.error('Systemd Manager (Helper): %s %r', method, e)
+
+            if self._process is not None and self._process.returncode is None:
+                self._process.kill()
+
+            return None
+
+        self.metrics.observe(method, time.perf_counter() - started, "error" in message)
+        self._is_connected = message.get("connected", self._is_connected)
+
+        if "error" in message:
+            _LOGGER.error('Systemd Manager (Helper): %s %s', method, message["error"])
+
+            return None
+
+        return message.get("result")
+
+    @staticmethod
+    def _encode_request(request_id: int, method: str, args: list) -> bytes:
+        return (json.dumps({"id": request_id, "method": method, "args": args}, default = _encode) + "\n").encode()
+
+    async def _async_read(self) -> None:
+        while True:
+            try:
+                line = await self._process.stdout.readline()
+            except (OSError, ValueError) as e:
+                _LOGGER.error('Systemd Manager (Helper): %r', e)
+
+                line = b""
+
+            if not line:
+                break
+
+            message = json.loads(line)
+
+            if "event" in message:
+                if self._callback is not None:
+                    self._callback(message["event"], message["unit"], message["properties"])
+
+                continue
+
+            future = self._requests.pop(message.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(message)
+
+        self._on_exit()
+
+    def _on_exit(self) -> None:
+        self._is_connected = False
+
+        for future in self._requests.values():
+            if not future.done():
+                future.set_result({"connected": False})
+
+        self._requests = {}
+
+        if self._is_closing:
+            return
+
+        _LOGGER.warning('Systemd Manager (Helper): the helper process exited')
+
+        if self._callback is not None:
+            self._callback(EVENT_DISCONNECTED, SYSTEMD_BUS_NAME, {})
+
+    async def _async_stop_process(self) -> None:
+        if self._process is None:
+            return
+
+        process, self._process = self._process, None
+
+        if process.returncode is None:
+            try:
+                await asyncio.wait_for(process.wait(), HELPER_TIMEOUT / 10)
+            except asyncio.TimeoutError:
+                process.kill()
+
+                await process.wait()
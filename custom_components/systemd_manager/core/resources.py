@@ -0,0 +1,109 @@
+import os
+import time
+import logging
+
+from typing import Optional
+
+from .const import (
+    CGROUP_ROOT,
+    UINT64_MAX,
+    RESOURCE_PROPERTIES,
+    ATTR_CPU,
+    ATTR_MEMORY,
+    ATTR_TASKS,
+    ATTR_IO_READ,
+    ATTR_IO_WRITE
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+def is_cgroup_available() -> bool:
+    return os.path.exists(os.path.join(CGROUP_ROOT, "cgroup.controllers"))
+
+def _read(path: str) -> str:
+    with open(path, "r") as file:
+        return file.read()
+
+def _read_stat(content: str) -> dict:
+    return {key: int(value) for key, value in (line.split() for line in content.splitlines() if line)}
+
+def _read_io_stat(content: str) -> dict:
+    values = {}
+
+    for line in content.splitlines():
+        for field in line.split()[1:]:
+            key, _, value = field.partition("=")
+            values[key] = values.get(key, 0) + int(value)
+
+    return values
+
+def read_cgroups(control_groups: dict) -> dict:
+    samples = {}
+
+    for unit_name, control_group in control_groups.items():
+        path = os.path.join(CGROUP_ROOT, control_group.lstrip("/"))
+
+        try:
+            cpu = _read_stat(_read(os.path.join(path, "cpu.stat")))
+            io = _read_io_stat(_read(os.path.join(path, "io.stat"))) if os.path.exists(os.path.join(path, "io.stat")) else {}
+
+            samples[unit_name] = {
+                ATTR_CPU: cpu["usage_usec"] * 1000 if "usage_usec" in cpu else None,
+                ATTR_MEMORY: int(_read(os.path.join(path, "memory.current"))),
+                ATTR_TASKS: int(_read(os.path.join(path, "pids.current"))),
+                ATTR_IO_READ: io.get("rbytes"),
+                ATTR_IO_WRITE: io.get("wbytes"),
+            }
+        except (OSError, ValueError) as e:
+            _LOGGER.debug('Systemd Manager: unable to read cgroup %s: %r', control_group, e)
+
+    return samples
+
+def parse_properties(properties: dict) -> dict:
+    sample = {}
+
+    for attribute, name in RESOURCE_PROPERTIES.items():
+        value = properties.get(name)
+        sample[attribute] = int(value) if value is not None and int(value) != UINT64_MAX else None
+
+    return sample
+
+class ResourceSampler(object):
+    def __init__(self) -> None:
+        self._samples: dict = {}
+
+    def update(self, unit_name: str, sample: dict, timestamp: Optional[float] = None) -> dict:
+        timestamp = timestamp if timestamp is not None else time.monotonic()
+        previous = self._samples.get(unit_name)
+
+        self._samples[unit_name] = (timestamp, sample)
+
+        resources = {
+            ATTR_MEMORY: sample[ATTR_MEMORY],
+            ATTR_TASKS: sample[ATTR_TASKS],
+            ATTR_CPU: None,
+            ATTR_IO_READ: None,
+            ATTR_IO_WRITE: None,
+        }
+
+        if previous is None or timestamp <= previous[0]:
+            return resources
+
+        elapsed = timestamp - previous[0]
+
+        for attribute in [ATTR_CPU, ATTR_IO_READ, ATTR_IO_WRITE]:
+            value, previous_value = sample[attribute], previous[1][attribute]
+
+            if value is None or previous_value is None or value < previous_value:
+                continue
+
+            resources[attribute] = (value - previous_value) / elapsed
+
+        if resources[ATTR_CPU] is not None:
+            resources[ATTR_CPU] = round(resources[ATTR_CPU] / 10 ** 7, 2)
+
+        return resources
+
+    def retain(self, unit_names: set) -> None:
+        for unit_name in [name for name in self._samples if name not in unit_names]:
+            del self._samples[unit_name]
@@ -1,36 +1,63 @@
+import sys
 import logging
 
 from typing import Optional
-from .manager import Manager, Mode
+from .base import BaseManager, Mode
+from .units import UnitType, UNIT_PROPERTIES, CONTROL_GROUP_PROPERTY, get_unit_type
 from .const import (
     UNIT_INTERFACE,
-    SERVICE_UNIT_INTERFACE,
     ATTR_UNIT_NAME,
     ATTR_REAL_STATE,
-    ATTR_TYPE,
     ATTR_EXIT_CODE,
-    ATTR_LAST_ACTIVITY,
-    ATTR_TRIGGERED_BY,
+    ATTR_UNIT_FILE_STATE,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
 class Service(object):
-    def __init__(self, name: str, state: str, manager: Manager) -> None:
+    __slots__ = (
+        "_name",
+        "_state",
+        "_manager",
+        "_is_added",
+        "_is_available",
+        "_is_block",
+        "_is_changed",
+        "_unit_type",
+        "_type_properties",
+        "_unit_properties",
+        "_file_state",
+        "_extra",
+        "_resources",
+        "_control_group",
+    )
+
+    def __init__(self, name: str, state: str, manager: BaseManager) -> None:
         self._name: str = name
-        self._state: str = state
-        self._manager: Manager = manager
+        self._state: str = sys.intern(str(state))
+        self._manager: BaseManager = manager
 
         self._is_added: bool = False
         self._is_available: bool = True
         self._is_block: bool = False
+        self._is_changed: bool = True
 
-        self._extra: dict = self.parse_extra()
+        self._unit_type: UnitType = get_unit_type(name)
+        self._type_properties: Optional[tuple] = None
+        self._unit_properties: Optional[tuple] = None
+        self._file_state: Optional[str] = None
+        self._extra: Optional[dict] = None
+        self._resources: dict = {}
+        self._control_group: Optional[str] = None
 
     @property
     def name(self) -> str:
         return self._name
 
+    @property
+    def state(self) -> str:
+        return self._state
+
     @property
     def is_added(self) -> bool:
         return self._is_added
@@ -39,61 +66,172 @@ class Service(object):
     def is_available(self) -> bool:
         return self._is_available
 
+    @property
+    def is_block(self) -> bool:
+        return self._is_block
+
+    @property
+    def exit_code(self) -> Optional[int]:
+        for prop, value in zip(self._unit_type.properties, self._type_properties or ()):
+            if prop.attribute == ATTR_EXIT_CODE:
+                return value
+
+        return None
+
+    @property
+    def unit_type(self) -> UnitType:
+        return self._unit_type
+
     @property
     def is_on(self) -> bool:
-        return self._state in ['running', 'start', 'wait-on']
+        return self._state in self._unit_type.on_states
+
+    @property
+    def control_group(self) -> str:
+        return self._control_group or "/system.slice/{}".format(self._name)
+
+    @property
+    def resources(self) -> dict:
+        return self._resources
 
     @property
     def extra(self) -> dict:
-        return {
+        if self._extra is not None:
+            return self._extra
+
+        extra = {
            ATTR_UNIT_NAME: self.name,
            ATTR_REAL_STATE: self._state
-        } | self._extra
+        }
 
-    def parse_extra(self) -> dict:
-        extra: dict = {}
+        if self._type_properties is not None:
+            for prop, value in zip(self._unit_type.properties, self._type_properties):
+                extra[prop.attribute] = prop.render(value)
 
-        service_properties = self._manager.get_unit_properties(self.name, SERVICE_UNIT_INTERFACE)
-        if service_properties is not None:
-            extra |= {
-                ATTR_TYPE: self._manager.get_type(service_properties),
-                ATTR_EXIT_CODE: self._manager.get_exec_status(service_properties)
-            }
+        if self._unit_properties is not None:
+            for prop, value in zip(UNIT_PROPERTIES, self._unit_properties):
+                extra[prop.attribute] = prop.render(value)
 
-        unit_properties = self._manager.get_unit_properties(self.name, UNIT_INTERFACE)
-        if unit_properties is not None:
-            extra |= {
-                ATTR_LAST_ACTIVITY: self._manager.get_last_activity(unit_properties),
-                ATTR_TRIGGERED_BY: self._manager.get_triggered_by(unit_properties)
-            }
+        if self._file_state is not None:
+            extra[ATTR_UNIT_FILE_STATE] = self._file_state
+
+        self._extra = extra
 
         return extra
 
+    def update_extra(self, properties: dict) -> None:
+        type_properties = properties.get(self._unit_type.interface)
+        if type_properties is not None:
+            control_group = type_properties.get(CONTROL_GROUP_PROPERTY)
+            if control_group:
+                self._control_group = str(control_group)
+
+            type_properties = tuple(prop.parse(type_properties) for prop in self._unit_type.properties)
+        else:
+            type_properties = self._type_properties
+
+        unit_properties = properties.get(UNIT_INTERFACE)
+        if unit_properties is not None:
+            unit_properties = tuple(prop.parse(unit_properties) for prop in UNIT_PROPERTIES)
+        else:
+            unit_properties = self._unit_properties
+
+        if type_properties != self._type_properties or unit_properties != self._unit_properties:
+            self._type_properties = type_properties
+            self._unit_properties = unit_properties
+            self._extra = None
+            self._is_changed = True
+
+    def update_file_state(self, file_state: Optional[str]) -> bool:
+        file_state = sys.intern(file_state) if file_state is not None else None
+
+        if file_state == self._file_state:
+            return False
+
+        self._file_state = file_state
+        self._extra = None
+        self._is_changed = True
+
+        return True
+
+    def as_dict(self) -> dict:
+        return {
+            "state": self._state,
+            "properties": list(self._type_properties) if self._type_properties is not None else None,
+            "unit": list(self._unit_properties) if self._unit_properties is not None else None,
+            "control_group": self._control_group,
+            "file_state": self._file_state,
+        }
+
+    @classmethod
+    def from_dict(cls, name: str, data: dict, manager: BaseManager) -> "Service":
+        service = cls(name, data["state"], manager)
+
+        if data.get("properties") is not None:
+            service._type_properties = tuple(
+                prop.parse({prop.name: value}) for prop, value in zip(service.unit_type.properties, data["properties"])
+            )
+
+        if data.get("unit") is not None:
+            service._unit_properties = tuple(
+                prop.parse({prop.name: value}) for prop, value in zip(UNIT_PROPERTIES, data["unit"])
+            )
+
+        service._control_group = data.get("control_group")
+        service._file_state = data.get("file_state")
+
+        return service
+
+    def update_resources(self, resources: dict) -> None:
+        self._resources = resources
+
+    def commit(self) -> bool:
+        is_changed = self._is_changed
+        self._is_changed = False
+
+        return is_changed
+
     def add(self) -> None:
         self._is_added = True
 
-    async def stop(self, mode: Mode = Mode.REPLACE) -> bool:
-        return self._manager.stop(self.name, mode)
+    def bind(self, manager: BaseManager) -> None:
+        self._manager = manager
+
+    async def stop(self, mode: Mode = Mode.REPLACE) -> Optional[str]:
+        return await self._manager.async_stop(self.name, mode)
+
+    async def start(self, mode: Mode = Mode.REPLACE) -> Optional[str]:
+        return await self._manager.async_start(self.name, mode)
 
-    async def start(self, mode: Mode = Mode.REPLACE) -> bool:
-        return self._manager.start(self.name, mode)
+    def unblock(self) -> None:
+        self._is_block = False
 
-    async def update_state(self, state: str, is_block: bool = False) -> None:
+    async def update_state(self, state: str, is_block: bool = False) -> bool:
         if self._is_block and not is_block:
             self._is_block = False
 
-            return
+            return False
 
-        if state != self._state:
-            self._extra = self.parse_extra()
+        is_changed = state != self._state
+
+        if is_changed or not self._is_available:
+            self._is_changed = True
+
+        if is_changed:
+            self._state = sys.intern(str(state))
+            self._extra = None
 
-        self._state = state
         self._is_available = True
 
         if is_block:
             self._is_block = True
 
+        return is_changed
+
     async def deactivate(self) -> None:
+        if self._is_available:
+            self._is_changed = True
+
         self._is_available = False
 
 class Services(object):
@@ -108,6 +246,9 @@ class Services(object):
         if service.name not in self._services:
             self._services[service.name] = service
 
+    def remove(self, name: str) -> None:
+        self._services.pop(name, None)
+
     def get(self, name: str) -> Optional[Service]:
         return self._services[name] if name in self._services else None
 
@@ -0,0 +1,38 @@
+import shlex
+import uuid
+
+from typing import Optional
+
+from .const import RUN_UNIT_PREFIX
+
+def get_run_unit_name() -> str:
+    return "{}{}.service".format(RUN_UNIT_PREFIX, uuid.uuid4().hex[:12])
+
+def split_command(command) -> list:
+    return shlex.split(command) if isinstance(command, str) else [str(arg) for arg in command]
+
+def build_properties(
+    argv: list,
+    cpu_quota: Optional[float] = None,
+    memory_max: Optional[int] = None,
+    runtime_max: Optional[float] = None
+) -> list:
+    properties = [
+        ["Description", "s", "Systemd Manager: {}".format(shlex.join(argv))],
+        ["Type", "s", "oneshot"],
+        ["RemainAfterExit", "b", True],
+        ["StandardOutput", "s", "journal"],
+        ["StandardError", "s", "journal"],
+        ["ExecStart", "a(sasb)", [[argv[0], argv, False]]],
+    ]
+
+    if cpu_quota:
+        properties.append(["CPUQuotaPerSecUSec", "t", int(cpu_quota * 10000)])
+
+    if memory_max:
+        properties.append(["MemoryMax", "t", int(memory_max)])
+
+    if runtime_max:
+        properties.append(["TimeoutStartUSec", "t", int(runtime_max * 1000000)])
+
+    return properties
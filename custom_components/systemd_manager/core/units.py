@@ -0,0 +1,191 @@
+import sys
+import datetime
+
+from typing import Optional, Callable
+
+from .const import (
+    UNIT_INTERFACE,
+    SERVICE_UNIT_INTERFACE,
+    TIMER_UNIT_INTERFACE,
+    SOCKET_UNIT_INTERFACE,
+    MOUNT_UNIT_INTERFACE,
+    PATH_UNIT_INTERFACE,
+    SCOPE_UNIT_INTERFACE,
+    UINT64_MAX,
+    ATTR_TYPE,
+    ATTR_EXIT_CODE,
+    ATTR_LAST_ACTIVITY,
+    ATTR_TRIGGERED_BY,
+    ATTR_NEXT_ELAPSE,
+    ATTR_LAST_TRIGGER,
+    ATTR_UNIT,
+    ATTR_ACCEPTED,
+    ATTR_CONNECTIONS,
+    ATTR_WHAT,
+    ATTR_WHERE,
+    ATTR_RESULT,
+)
+
+CONTROL_GROUP_PROPERTY = "ControlGroup"
+
+def format_timestamp(value: Optional[int]) -> Optional[str]:
+    if not value or value == UINT64_MAX:
+        return None
+
+    return datetime.datetime.utcfromtimestamp(value / 1000000).strftime('%Y-%m-%d %H:%M:%S')
+
+def format_units(value: Optional[tuple]) -> Optional[str]:
+    return ', '.join(value) if value is not None else None
+
+def intern(value) -> str:
+    return sys.intern(str(value))
+
+def intern_units(value) -> tuple:
+    return tuple(sys.intern(str(unit)) for unit in value)
+
+class UnitProperty(object):
+    __slots__ = ("attribute", "name", "convert", "format")
+
+    def __init__(self, attribute: str, name: str, convert: Callable, format: Optional[Callable] = None) -> None:
+        self.attribute: str = attribute
+        self.name: str = name
+        self.convert: Callable = convert
+        self.format: Optional[Callable] = format
+
+    def parse(self, properties: dict):
+        value = properties.get(self.name)
+
+        return self.convert(value) if value is not None else None
+
+    def render(self, value):
+        return self.format(value) if self.format is not None else value
+
+UNIT_PROPERTIES = (
+    UnitProperty(ATTR_LAST_ACTIVITY, "StateChangeTimestamp", int, format_timestamp),
+    UnitProperty(ATTR_TRIGGERED_BY, "TriggeredBy", intern_units, format_units),
+)
+
+class UnitType(object):
+    __slots__ = ("suffix", "interface", "properties", "on_states", "has_cgroup")
+
+    def __init__(
+        self,
+        suffix: str,
+        interface: Optional[str] = None,
+        properties: tuple = (),
+        on_states: frozenset = frozenset(['running']),
+        has_cgroup: bool = False
+    ) -> None:
+        self.suffix: str = suffix
+        self.interface: Optional[str] = interface
+        self.properties: tuple = properties
+        self.on_states: frozenset = on_states
+        self.has_cgroup: bool = has_cgroup
+
+    @property
+    def request(self) -> dict:
+        request = {UNIT_INTERFACE: [prop.name for prop in UNIT_PROPERTIES]}
+
+        if self.interface is not None:
+            request[self.interface] = [prop.name for prop in self.properties]
+
+            if self.has_cgroup:
+                request[self.interface].append(CONTROL_GROUP_PROPERTY)
+
+        return request
+
+UNIT_TYPES = {
+    unit_type.suffix: unit_type for unit_type in [
+        UnitType(
+            ".service",
+            SERVICE_UNIT_INTERFACE,
+            (
+                UnitProperty(ATTR_TYPE, "Type", intern),
+                UnitProperty(ATTR_EXIT_CODE, "ExecMainStatus", int),
+            ),
+            frozenset(['running', 'start', 'wait-on']),
+            True
+        ),
+        UnitType(
+            ".timer",
+            TIMER_UNIT_INTERFACE,
+            (
+                UnitProperty(ATTR_NEXT_ELAPSE, "NextElapseUSecRealtime", int, format_timestamp),
+                UnitProperty(ATTR_LAST_TRIGGER, "LastTriggerUSec", int, format_timestamp),
+                UnitProperty(ATTR_UNIT, "Unit", intern),
+            ),
+            frozenset(['waiting', 'running', 'elapsed'])
+        ),
+        UnitType(
+            ".socket",
+            SOCKET_UNIT_INTERFACE,
+            (
+                UnitProperty(ATTR_ACCEPTED, "NAccepted", int),
+                UnitProperty(ATTR_CONNECTIONS, "NConnections", int),
+            ),
+            frozenset(['listening', 'running']),
+            True
+        ),
+        UnitType(
+            ".mount",
+            MOUNT_UNIT_INTERFACE,
+            (
+                UnitProperty(ATTR_WHAT, "What", intern),
+                UnitProperty(ATTR_WHERE, "Where", intern),
+                UnitProperty(ATTR_TYPE, "Type", intern),
+            ),
+            frozenset(['mounted', 'mounting', 'remounting']),
+            True
+        ),
+        UnitType(
+            ".path",
+            PATH_UNIT_INTERFACE,
+            (
+                UnitProperty(ATTR_UNIT, "Unit", intern),
+                UnitProperty(ATTR_RESULT, "Result", intern),
+            ),
+            frozenset(['waiting', 'running'])
+        ),
+        UnitType(
+            ".scope",
+            SCOPE_UNIT_INTERFACE,
+            (
+                UnitProperty(ATTR_RESULT, "Result", intern),
+            ),
+            frozenset(['running', 'abandoned']),
+            True
+        ),
+        UnitType(
+            ".target",
+            on_states = frozenset(['active'])
+        ),
+    ]
+}
+
+UNIT_SUFFIXES = tuple(UNIT_TYPES)
+
+GENERIC_UNIT_TYPE = UnitType("", on_states = frozenset(['running', 'active', 'listening', 'waiting', 'mounted', 'plugged']))
+
+def get_unit_type(unit_name: str) -> UnitType:
+    _, dot, suffix = unit_name.rpartition(".")
+
+    return UNIT_TYPES.get(dot + suffix, GENERIC_UNIT_TYPE)
+
+def get_template_name(unit_name: str) -> Optional[str]:
+    prefix, at, instance = unit_name.partition("@")
+    if not at or instance.startswith("."):
+        return None
+
+    _, dot, suffix = instance.rpartition(".")
+    if not dot:
+        return None
+
+    return "{}@.{}".format(prefix, suffix)
+
+def group_by_type(unit_names: list) -> dict:
+    groups = {}
+
+    for unit_name in unit_names:
+        groups.setdefault(get_unit_type(unit_name), []).append(unit_name)
+
+    return groups
@@ -1,14 +1,86 @@
+import time
 import logging
-from datetime import timedelta
+import asyncio
+import fnmatch
+import datetime
+from typing import Optional
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
 from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
 from homeassistant.const import CONF_SCAN_INTERVAL
 
-from .const import DOMAIN, DATA_UPDATED, SCAN_INTERVAL, CONF_SERVICES_LIST
-from .manager import Manager
+from .const import (
+    DOMAIN,
+    PLATFORMS,
+    DATA_UPDATED,
+    SERVICE_UPDATED,
+    COALESCE_DELAY,
+    STORAGE_VERSION,
+    STORAGE_KEY,
+    SNAPSHOT_DELAY,
+    CATALOG_TTL,
+    CATALOG_DELAY,
+    METRICS_UPDATED,
+    RESOURCES_UPDATED,
+    HISTORY_UPDATED,
+    HISTORY_TICK,
+    HISTORY_TICK_INTERVAL,
+    SCAN_INTERVAL,
+    RECONCILE_INTERVAL,
+    FAST_SCAN_INTERVAL,
+    FAST_WINDOW,
+    BACKOFF_FACTOR,
+    MAX_BACKOFF,
+    DEFAULT_JOB_TIMEOUT,
+    DEFAULT_RUN_TIMEOUT,
+    JOB_POLL_INTERVAL,
+    PENDING_STATES,
+    RUN_OUTPUT_SETTLE,
+    RUN_OUTPUT_WAIT,
+    DEFAULT_CONCURRENCY,
+    JOB_CACHE_SIZE,
+    RECONNECT_INTERVAL,
+    MAX_RECONNECT_INTERVAL,
+    DEFAULT_JOURNAL_SIZE,
+    RESOURCE_PROPERTIES,
+    UNAVAILABLE_STATE,
+    UNIT_INTERFACE,
+    SERVICE_UNIT_INTERFACE,
+    SERVICE_START,
+    SERVICE_STOP,
+    SERVICE_RESTART,
+    CONF_ADDRESS,
+    CONF_SERVICES_LIST,
+    CONF_PATTERNS,
+    CONF_PUSH_MODE,
+    CONF_BACKEND,
+    CONF_JOURNAL_SIZE,
+    CONF_RESOURCES,
+    CONF_HISTORY,
+    BACKEND_DBUS_PYTHON,
+    EVENT_UNIT_CHANGED,
+    EVENT_UNIT_NEW,
+    EVENT_UNIT_REMOVED,
+    EVENT_JOB_REMOVED,
+    EVENT_UNIT_FILES_CHANGED,
+    EVENT_RELOADED,
+    EVENT_CONNECTED,
+    EVENT_DISCONNECTED
+)
+from .base import BaseManager, Mode
+from .backend import async_create_manager
+from .cache import LruCache
+from .catalog import UnitCatalog
+from .journal import Journal
+from .resources import ResourceSampler, is_cgroup_available, read_cgroups, parse_properties
+from .units import group_by_type, get_template_name
+from .history import History
+from .graph import DependencyGraph, DEPENDENCY_PROPERTIES
+from .transient import get_run_unit_name, split_command, build_properties
+from .metrics import Metrics, StepTimer
 from .service import Service, Services
 
 _LOGGER = logging.getLogger(__name__)
@@ -18,81 +90,962 @@ class Worker(object):
         self.hass = hass
         self.config_entry = config_entry
         self.unsub_timer = None
+        self._is_unloaded = False
         self._is_block = False
+        self._is_changed = False
+        self._interval: float = SCAN_INTERVAL
+        self._next_refresh: float = 0
+        self._fast_until: float = 0
+        self._is_subscribed = False
+        self._is_connected = False
+        self._reconnect_attempts: int = 0
+        self._selected: set = set()
+        self._patterns: list = []
+        self._current: set = set()
+        self._jobs: dict = {}
+        self._finished_jobs: LruCache = LruCache(JOB_CACHE_SIZE)
 
-        self._manager = Manager()
+        self._pending: set = set()
+        self._history_pending: set = set()
+        self._is_structure_changed: bool = False
+        self._unsub_flush = None
+        self._is_snapshot_pending = False
+
+        self._catalog = UnitCatalog()
+        self._catalog_pending: set = set()
+        self._is_catalog_files_changed: bool = False
+        self._is_catalog_refreshing: bool = False
+        self._unsub_catalog = None
+
+        self._unit_files: dict = {}
+        self._unit_files_key: Optional[tuple] = None
+        self._unit_files_updated: float = 0
+        self._unsub_unit_files = None
+
+        self._manager: Optional[BaseManager] = None
+        self._journal: Optional[Journal] = None
         self._services = Services()
+        self._metrics = Metrics()
+        self._dbus_metrics = Metrics()
+        self._sampler = ResourceSampler()
+        self._history = History()
+        self._graph = DependencyGraph()
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY.format(config_entry.entry_id))
 
     @property
-    def manager(self) -> Manager:
+    def manager(self) -> BaseManager:
         return self._manager
 
+    @property
+    def metrics(self) -> Metrics:
+        return self._metrics
+
     @property
     def scan_interval(self) -> int:
         return self.config_entry.options.get(CONF_SCAN_INTERVAL, SCAN_INTERVAL)
 
+    @property
+    def address(self) -> str:
+        return self.config_entry.options.get(CONF_ADDRESS, "")
+
+    @property
+    def host(self) -> str:
+        return self.config_entry.title
+
+    @property
+    def backend(self) -> str:
+        return self.config_entry.options.get(CONF_BACKEND, BACKEND_DBUS_PYTHON)
+
+    @property
+    def push_mode(self) -> bool:
+        return self.config_entry.options.get(CONF_PUSH_MODE, False)
+
+    @property
+    def journal_size(self) -> int:
+        return self.config_entry.options.get(CONF_JOURNAL_SIZE, DEFAULT_JOURNAL_SIZE)
+
+    @property
+    def resources(self) -> bool:
+        return self.config_entry.options.get(CONF_RESOURCES, False)
+
+    @property
+    def history_sensors(self) -> bool:
+        return self.config_entry.options.get(CONF_HISTORY, False)
+
+    @property
+    def history(self) -> History:
+        return self._history
+
+    @property
+    def graph(self) -> DependencyGraph:
+        return self._graph
+
+    @property
+    def catalog(self) -> UnitCatalog:
+        return self._catalog
+
+    @property
+    def journal(self) -> Optional[Journal]:
+        return self._journal
+
+    @property
+    def is_subscribed(self) -> bool:
+        return self._is_subscribed
+
+    @property
+    def is_connected(self) -> bool:
+        return self._is_connected
+
     @property
     def services(self) -> list:
         return self._services
 
-    async def async_update(self) -> None:
+    def is_selected(self, unit_name: str) -> bool:
+        return unit_name in self._selected or any(
+            fnmatch.fnmatchcase(unit_name, pattern) for pattern in self._patterns
+        )
+
+    async def async_update(self, is_full: bool = False) -> None:
         if self._is_block:
+            self._metrics.increment("skipped")
+
             return
 
         self._is_block = True
 
-        selected = self.config_entry.options.get(CONF_SERVICES_LIST, [])
+        started = time.perf_counter()
+        timer = StepTimer(self._async_refresh(is_full))
+
+        try:
+            is_refreshed = await timer
+        finally:
+            self._is_block = False
+
+        if not is_refreshed:
+            await self.async_disconnected()
+
+            return
+
+        duration = time.perf_counter() - started
+
+        self._metrics.observe("refresh", duration)
+        self._metrics.observe("refresh_loop", timer.elapsed)
+
+        if duration > self.scan_interval:
+            self._metrics.increment("overruns")
+
+        async_dispatcher_send(self.hass, METRICS_UPDATED.format(self.config_entry.entry_id))
+
+    async def _async_refresh(self, is_full: bool) -> bool:
+        self._load_selection()
+
+        known_services = set(self.services.list)
+        current_services = set()
+        changed_services = []
+        services = await self._manager.async_list(list(self._selected) + self._patterns)
+
+        if not self._manager.is_connected:
+            return False
 
-        current_services = []
-        services = self._manager.list()
         for service_name in services:
-            if service_name not in selected:
+            if not self.is_selected(service_name):
                 if self.services.has(service_name):
                     await self.services.get(service_name).deactivate()
 
                 continue
 
-            current_services.append(service_name)
+            current_services.add(service_name)
 
             if self.services.has(service_name):
-                await self.services.get(service_name).update_state(services[service_name])
+                if await self.services.get(service_name).update_state(services[service_name]):
+                    changed_services.append(service_name)
 
                 continue
 
             await self.services.async_append(Service(service_name, services[service_name], self.manager))
+            changed_services.append(service_name)
 
-        for service in self.services.list:
-            if service not in current_services:
-                await self.services.list[service].deactivate()
+        for service_name in list(self.services.list):
+            if service_name in current_services:
+                continue
 
-        async_dispatcher_send(self.hass, DATA_UPDATED)
+            if service_name in self._selected:
+                await self.services.get(service_name).deactivate()
+            else:
+                self.services.remove(service_name)
 
-        self._is_block = False
+        self._current = current_services
+        self._history.retain(set(self.services.list))
+        self._graph.retain(current_services)
+
+        self._is_changed = len(changed_services) > 0 or known_services != set(self.services.list)
+
+        await self.async_refresh_services(list(current_services) if is_full else changed_services)
+        await self.async_refresh_graph([name for name in current_services if name not in self._graph])
+        await self.async_refresh_unit_files()
+
+        if self.resources:
+            await self.async_refresh_resources()
+
+        if self._is_subscribed:
+            await self._manager.async_watch(list(self._current))
+
+        if self._journal is not None:
+            await self._journal.async_watch(list(self._current))
+
+        self.notify(known_services | set(self.services.list), known_services != set(self.services.list))
+
+        return True
+
+    def _load_selection(self) -> None:
+        self._selected = set(self.config_entry.options.get(CONF_SERVICES_LIST, []))
+        self._patterns = [
+            pattern.strip() for pattern in self.config_entry.options.get(CONF_PATTERNS, "").split(",") if pattern.strip()
+        ]
+
+    async def async_restore(self) -> None:
+        snapshot = await self._store.async_load()
+        if not snapshot:
+            return
+
+        self._load_selection()
+
+        units = {name: data for name, data in snapshot.get("units", {}).items() if self.is_selected(name)}
+
+        for service_name, data in units.items():
+            await self.services.async_append(Service.from_dict(service_name, data, self.manager))
+
+            if data.get("history"):
+                self._history.restore(service_name, data["history"])
+
+        self._current = set(units)
+
+        await self._manager.async_preload({name: data["path"] for name, data in units.items() if data.get("path")})
+
+        _LOGGER.debug('Systemd Manager (%s): restored %s services from the snapshot', self.host, len(units))
+
+    @callback
+    def _get_snapshot(self) -> dict:
+        self._is_snapshot_pending = False
+
+        unit_paths = self._manager.get_unit_paths() if self._manager is not None else {}
+
+        return {
+            "units": {
+                name: service.as_dict() | {"path": unit_paths.get(name), "history": self._get_history(name)}
+                for name, service in self.services.list.items() if service.is_available
+            }
+        }
+
+    def _get_history(self, service_name: str) -> list:
+        timeline = self._history.get(service_name)
+
+        return timeline.as_list() if timeline is not None else []
+
+    async def async_add_service(self, service_name: str) -> None:
+        services = await self._manager.async_list([service_name])
+        if service_name not in services:
+            return
+
+        is_new = not self.services.has(service_name)
+
+        if is_new:
+            await self.services.async_append(Service(service_name, services[service_name], self.manager))
+        else:
+            await self.services.get(service_name).update_state(services[service_name])
+
+        self._current.add(service_name)
+
+        await self.async_refresh_services([service_name])
+        await self.async_refresh_graph([service_name])
+        await self.async_refresh_unit_files(self._find_unit_file(service_name) is None)
+
+        if self._is_subscribed:
+            await self._manager.async_watch(list(self._current))
+
+        if self._journal is not None:
+            await self._journal.async_watch(list(self._current))
+
+        self.notify([service_name], is_new)
+
+    async def async_refresh_services(self, service_names: list) -> None:
+        if len(service_names) == 0:
+            return
+
+        for unit_type, unit_names in group_by_type(service_names).items():
+            properties = await self._manager.async_get_units_properties(unit_names, unit_type.request)
+
+            for service_name in unit_names:
+                self.services.get(service_name).update_extra(properties.get(service_name, {}))
+
+    async def async_refresh_resources(self) -> None:
+        services = [
+            service for name, service in self.services.list.items()
+            if name in self._current and service.is_available and service.is_on and service.unit_type.has_cgroup
+        ]
+
+        samples = {}
+        if not self.address and is_cgroup_available():
+            samples = await self.hass.async_add_executor_job(
+                read_cgroups, {service.name: service.control_group for service in services}
+            )
+
+        missing = [service.name for service in services if service.name not in samples]
+        for unit_type, unit_names in group_by_type(missing).items():
+            properties = await self._manager.async_get_units_properties(
+                unit_names, {unit_type.interface: list(RESOURCE_PROPERTIES.values())}
+            )
+
+            for service_name in unit_names:
+                type_properties = properties.get(service_name, {}).get(unit_type.interface)
+                if type_properties is not None:
+                    samples[service_name] = parse_properties(type_properties)
+
+        now = time.monotonic()
+
+        for service in self.services.list.values():
+            service.update_resources(
+                self._sampler.update(service.name, samples[service.name], now) if service.name in samples else {}
+            )
+
+        self._sampler.retain(set(samples))
+
+        async_dispatcher_send(self.hass, RESOURCES_UPDATED.format(self.config_entry.entry_id))
+
+    async def async_refresh_graph(self, service_names: list) -> None:
+        if not self._graph.is_built or len(service_names) == 0:
+            return
+
+        properties = await self._manager.async_get_units_properties(
+            service_names, {UNIT_INTERFACE: DEPENDENCY_PROPERTIES}
+        )
+
+        for service_name in service_names:
+            self._graph.update(service_name, properties.get(service_name, {}).get(UNIT_INTERFACE, {}))
+
+    async def async_ensure_graph(self) -> DependencyGraph:
+        if self._graph.is_built:
+            return self._graph
+
+        service_names = list(self._current)
+        properties = await self._manager.async_get_units_properties(
+            service_names, {UNIT_INTERFACE: DEPENDENCY_PROPERTIES}
+        )
+
+        self._graph.build({
+            service_name: properties.get(service_name, {}).get(UNIT_INTERFACE, {}) for service_name in service_names
+        })
+
+        return self._graph
+
+    async def async_cascade(
+        self,
+        action: str,
+        unit_name: str,
+        mode: Mode = Mode.REPLACE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_JOB_TIMEOUT
+    ) -> dict:
+        graph = await self.async_ensure_graph()
+        levels = graph.levels([unit_name] + graph.impact(unit_name))
+
+        phases = []
+        if action in [SERVICE_STOP, SERVICE_RESTART]:
+            phases += [(self._manager.async_stop, False, level) for level in reversed(levels)]
+
+        if action in [SERVICE_START, SERVICE_RESTART]:
+            phases += [(self._manager.async_start, True, level) for level in levels]
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def async_run(method, is_start: bool, name: str) -> Optional[str]:
+            async with semaphore:
+                job = await method(name, mode)
+
+            if job is None:
+                return "failed"
+
+            return await self.async_wait_job(job, timeout, name, is_start)
+
+        jobs = {}
+        for method, is_start, level in phases:
+            if any(result != "done" for result in jobs.values()):
+                jobs |= {name: "skipped" for name in level}
+
+                continue
+
+            jobs |= dict(zip(level, await asyncio.gather(*[async_run(method, is_start, name) for name in level])))
+
+        self.boost()
+
+        return {
+            "levels": levels,
+            "jobs": jobs,
+            "results": {name: result == "done" for name, result in jobs.items()},
+        }
+
+    async def async_run(
+        self,
+        command,
+        cpu_quota: Optional[float] = None,
+        memory_max: Optional[int] = None,
+        runtime_max: Optional[float] = None,
+        timeout: float = DEFAULT_RUN_TIMEOUT,
+        lines: Optional[int] = None
+    ) -> dict:
+        argv = split_command(command)
+        unit_name = get_run_unit_name()
+
+        run = {"unit": unit_name, "job": "failed", "result": None, "exit_status": None, "output": []}
+
+        if len(argv) == 0:
+            return run
+
+        job = await self._manager.async_start_transient(
+            unit_name, build_properties(argv, cpu_quota, memory_max, runtime_max)
+        )
+        if job is None:
+            return run
+
+        run["job"] = await self.async_wait_job(job, timeout, unit_name) or "timeout"
+
+        properties = (await self._manager.async_get_units_properties([unit_name], {
+            UNIT_INTERFACE: ["ActiveState"],
+            SERVICE_UNIT_INTERFACE: ["Result", "ExecMainStatus"],
+        })).get(unit_name, {})
+
+        service = properties.get(SERVICE_UNIT_INTERFACE, {})
+
+        if "Result" in service:
+            run["result"] = str(service["Result"])
+
+        if "ExecMainStatus" in service:
+            run["exit_status"] = int(service["ExecMainStatus"])
+
+        if self._journal is not None:
+            run["output"] = await self._async_read_output(unit_name, lines)
+
+        if properties.get(UNIT_INTERFACE, {}).get("ActiveState") == "failed":
+            await self._manager.async_reset_failed(unit_name)
+        else:
+            await self._manager.async_stop(unit_name, Mode.REPLACE)
+
+        return run
+
+    async def _async_read_output(self, unit_name: str, lines: Optional[int] = None) -> list:
+        output = await self._journal.async_read(unit_name, lines)
+        deadline = time.monotonic() + RUN_OUTPUT_WAIT
+
+        while time.monotonic() < deadline:
+            await asyncio.sleep(RUN_OUTPUT_SETTLE)
+
+            latest = await self._journal.async_read(unit_name, lines)
+            if latest == output:
+                break
+
+            output = latest
+
+        return output
+
+    async def _async_poll_job(self, unit_name: str, timeout: float, is_start: bool) -> Optional[str]:
+        deadline = time.monotonic() + timeout
+
+        while time.monotonic() < deadline:
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+
+            properties = await self._manager.async_get_units_properties([unit_name], {UNIT_INTERFACE: ["ActiveState"]})
+            state = properties.get(unit_name, {}).get(UNIT_INTERFACE, {}).get("ActiveState")
+
+            if state not in PENDING_STATES:
+                return "done" if (state == "active") == is_start else "failed"
+
+        _LOGGER.warning('Systemd Manager: %s did not settle in %s seconds', unit_name, timeout)
+
+        return None
+
+    async def async_refresh_catalog(self) -> None:
+        if self._is_catalog_refreshing:
+            return
+
+        self._is_catalog_refreshing = True
+
+        try:
+            units = await self._manager.async_list_units_details()
+            if units is not None:
+                self._catalog.update_units(units, True)
+
+            unit_files = await self._manager.async_list_unit_files()
+            if unit_files is not None:
+                self._catalog.update_files(unit_files)
+        finally:
+            self._is_catalog_refreshing = False
+
+    @callback
+    def ensure_catalog(self) -> None:
+        if not self._is_connected:
+            return
+
+        if self._catalog.updated == 0 or time.monotonic() - self._catalog.updated > CATALOG_TTL:
+            self.hass.async_create_task(self.async_refresh_catalog())
+
+    def _find_unit_file(self, unit_name: str) -> Optional[str]:
+        if unit_name in self._unit_files:
+            return unit_name
+
+        template_name = get_template_name(unit_name)
+
+        return template_name if template_name in self._unit_files else None
+
+    async def async_refresh_unit_files(self, is_forced: bool = False) -> None:
+        templates = {get_template_name(name) for name in self._selected} - {None}
+        patterns = sorted(self._selected | templates) + self._patterns
+        is_stale = tuple(patterns) != self._unit_files_key or (
+            not self._is_subscribed and time.monotonic() - self._unit_files_updated > RECONCILE_INTERVAL
+        )
+
+        if is_forced or is_stale:
+            unit_files = await self._manager.async_list_unit_files(patterns)
+
+            if unit_files is not None:
+                self._unit_files = unit_files
+                self._unit_files_key = tuple(patterns)
+                self._unit_files_updated = time.monotonic()
+
+        changed = [
+            name for name, service in self.services.list.items()
+            if service.update_file_state(self._unit_files.get(self._find_unit_file(name)))
+        ]
+
+        if len(changed) > 0:
+            self.notify(changed)
+
+    @callback
+    def _schedule_unit_files(self) -> None:
+        if self._unsub_unit_files is None:
+            self._unsub_unit_files = async_call_later(self.hass, COALESCE_DELAY, self._async_flush_unit_files)
+
+    async def _async_flush_unit_files(self, now = None) -> None:
+        self._unsub_unit_files = None
+
+        await self.async_refresh_unit_files(True)
+
+    @callback
+    def _schedule_catalog(self) -> None:
+        if self._unsub_catalog is None:
+            self._unsub_catalog = async_call_later(self.hass, CATALOG_DELAY, self._async_flush_catalog)
+
+    async def _async_flush_catalog(self, now = None) -> None:
+        self._unsub_catalog = None
+
+        unit_names, self._catalog_pending = list(self._catalog_pending), set()
+        is_files_changed, self._is_catalog_files_changed = self._is_catalog_files_changed, False
+
+        if len(unit_names) > 0:
+            units = await self._manager.async_list_units_details(unit_names)
+            if units is not None:
+                self._catalog.update_units(units)
+
+        if is_files_changed:
+            unit_files = await self._manager.async_list_unit_files()
+            if unit_files is not None:
+                self._catalog.update_files(unit_files)
+
+    async def async_refresh_state(self, service_name: str) -> None:
+        service = self.services.get(service_name)
+        if service is None:
+            return
+
+        services = await self._manager.async_list([service_name])
+
+        service.unblock()
+
+        if service_name in services and await service.update_state(services[service_name]):
+            await self.async_refresh_services([service_name])
+
+        self.notify([service_name])
+
+    async def async_wait_job(
+        self,
+        job: Optional[str],
+        timeout: float = DEFAULT_JOB_TIMEOUT,
+        unit_name: Optional[str] = None,
+        is_start: bool = True
+    ) -> Optional[str]:
+        if not job:
+            return None
+
+        if not self._is_subscribed:
+            return await self._async_poll_job(unit_name, timeout, is_start) if unit_name else None
+
+        result = self._finished_jobs.pop(job)
+        if result is not None:
+            return result
+
+        future = self._jobs.setdefault(job, self.hass.loop.create_future())
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            _LOGGER.warning('Systemd Manager: job %s did not finish in %s seconds', job, timeout)
+
+            return None
+
+    async def async_handle_event(self, event: str, unit_name: str, properties: dict) -> None:
+        if event == EVENT_DISCONNECTED:
+            if self._is_connected:
+                await self.async_disconnected()
+                self.schedule_update(self._get_reconnect_interval())
+
+            return
+
+        if event == EVENT_CONNECTED:
+            self._reconnect_attempts = 0
+
+            if not self._is_connected:
+                self.schedule_update(0)
+
+            return
+
+        if event == EVENT_RELOADED:
+            self._graph.invalidate()
+            self._schedule_unit_files()
+
+            return
+
+        if event == EVENT_UNIT_FILES_CHANGED:
+            self._graph.invalidate()
+            self._schedule_unit_files()
+
+            if self._catalog.updated > 0:
+                self._is_catalog_files_changed = True
+                self._schedule_catalog()
+
+            return
+
+        if self._catalog.updated > 0:
+            if event == EVENT_UNIT_NEW and unit_name not in self._catalog:
+                self._catalog_pending.add(unit_name)
+                self._schedule_catalog()
+
+            if event == EVENT_UNIT_REMOVED:
+                self._catalog_pending.discard(unit_name)
+                self._catalog.remove_unit(unit_name)
+
+        if event == EVENT_JOB_REMOVED:
+            future = self._jobs.pop(properties["job"], None)
+            if future is None:
+                self._finished_jobs.set(properties["job"], properties["result"])
+            elif not future.done():
+                future.set_result(properties["result"])
+
+            if self.services.has(unit_name):
+                await self.async_refresh_state(unit_name)
+
+            return
+
+        if not self.is_selected(unit_name):
+            return
+
+        if event == EVENT_UNIT_NEW:
+            if unit_name not in self._current:
+                await self.async_add_service(unit_name)
+
+            return
+
+        service = self.services.get(unit_name)
+        if service is None:
+            return
+
+        if event == EVENT_UNIT_REMOVED:
+            self._current.discard(unit_name)
+
+            if unit_name in self._selected:
+                await service.deactivate()
+            else:
+                self.services.remove(unit_name)
+                self.notify([], True)
+
+                return
+
+        if event == EVENT_UNIT_CHANGED:
+            if "SubState" not in properties:
+                return
+
+            if await service.update_state(str(properties["SubState"])):
+                await self.async_refresh_services([unit_name])
+
+        self.notify([unit_name])
+
+    @callback
+    def notify(self, service_names, is_structure_changed: bool = False) -> None:
+        for service_name in service_names:
+            service = self.services.get(service_name)
+
+            if service is not None and not service.is_block and self._history.record(
+                service_name, service.state if service.is_available else UNAVAILABLE_STATE, service.exit_code
+            ):
+                self._history_pending.add(service_name)
+
+        self._pending.update(service_names)
+        self._is_structure_changed = self._is_structure_changed or is_structure_changed
+
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(self.hass, COALESCE_DELAY, self._flush)
+
+    @callback
+    def _flush(self, now = None) -> None:
+        self._unsub_flush = None
+
+        is_changed = self._is_structure_changed
+
+        if self._is_structure_changed:
+            self._is_structure_changed = False
+
+            async_dispatcher_send(self.hass, DATA_UPDATED.format(self.config_entry.entry_id))
+
+        pending, self._pending = self._pending, set()
+
+        for service_name in pending:
+            service = self.services.get(service_name)
+
+            if service is not None and service.commit():
+                is_changed = True
+
+                async_dispatcher_send(self.hass, SERVICE_UPDATED.format(self.config_entry.entry_id, service_name))
+
+        history_pending, self._history_pending = self._history_pending, set()
+
+        if self.history_sensors:
+            for service_name in history_pending:
+                async_dispatcher_send(self.hass, HISTORY_UPDATED.format(self.config_entry.entry_id, service_name))
+
+        if is_changed and self._is_connected and not self._is_snapshot_pending:
+            self._is_snapshot_pending = True
+            self._store.async_delay_save(self._get_snapshot, SNAPSHOT_DELAY)
+
+    @callback
+    def _tick_history(self, now = None) -> None:
+        if self.history_sensors:
+            async_dispatcher_send(self.hass, HISTORY_TICK.format(self.config_entry.entry_id))
+
+    async def async_set_push_mode(self) -> None:
+        def handle_event(event: str, unit_name: str, properties: dict) -> None:
+            self.hass.loop.call_soon_threadsafe(
+                self.hass.async_create_task, self.async_handle_event(event, unit_name, properties)
+            )
+
+        if self.push_mode and not self._is_subscribed:
+            self._is_subscribed = await self._manager.async_subscribe(handle_event)
+
+        if not self.push_mode and self._is_subscribed:
+            await self._manager.async_unsubscribe()
+            self._is_subscribed = False
+
+    async def async_set_journal(self) -> None:
+        size = 0 if self.address else self.journal_size
+
+        if self._journal is not None and self._journal.size != size:
+            await self._journal.async_stop()
+            self._journal = None
+
+        if self._journal is None and size > 0:
+            journal = Journal(self.hass, size)
+
+            if await journal.async_start():
+                self._journal = journal
+
+    async def async_connect(self) -> None:
+        self._manager = await async_create_manager(self.hass, self.backend, self.address, self._dbus_metrics)
+
+    async def async_close(self) -> None:
+        if self._manager is not None:
+            await self._manager.async_close()
+
+        self._is_subscribed = False
+
+    async def async_unload(self) -> None:
+        self._is_unloaded = True
+
+        for unsub in [self.unsub_timer, self._unsub_flush, self._unsub_catalog, self._unsub_unit_files]:
+            if unsub is not None:
+                unsub()
+
+        self.unsub_timer = self._unsub_flush = self._unsub_catalog = self._unsub_unit_files = None
+
+        for future in self._jobs.values():
+            if not future.done():
+                future.set_result(None)
+
+        self._jobs = {}
+
+        if self._journal is not None:
+            await self._journal.async_stop()
+            self._journal = None
+
+        await self.async_close()
+
+    async def async_disconnected(self) -> None:
+        if not self._is_connected:
+            return
+
+        self._is_connected = False
+        self._metrics.increment("disconnects")
+
+        _LOGGER.warning('Systemd Manager (%s): connection to D-Bus lost, reconnecting', self.host)
+
+        for future in self._jobs.values():
+            if not future.done():
+                future.set_result(None)
+
+        self._jobs = {}
+
+        for service in self.services.list.values():
+            await service.deactivate()
+
+        self.notify(list(self.services.list))
+
+    async def async_reconnect(self) -> None:
+        self._reconnect_attempts += 1
+
+        await self.async_close()
+
+        try:
+            await self.async_connect()
+        except ConnectionError as e:
+            _LOGGER.debug('Systemd Manager (%s): reconnect failed: %s', self.host, e)
+
+            return
+
+        for service in self.services.list.values():
+            service.bind(self._manager)
+
+        self._graph.invalidate()
+        self._unit_files_key = None
+
+        await self.async_set_push_mode()
+        await self.async_update(True)
+
+        if not self._manager.is_connected:
+            return
+
+        self._is_connected = True
+        self._reconnect_attempts = 0
+        self._metrics.increment("reconnects")
+
+        _LOGGER.warning('Systemd Manager (%s): connection to D-Bus restored', self.host)
 
     async def async_setup(self) -> bool:
         _LOGGER.debug("Systemd Manager async setup")
 
-        self.set_scan_interval()
-        self.config_entry.add_update_listener(self.async_options_updated)
+        if self._manager is None:
+            await self.async_connect()
+
+        self._is_connected = True
+
+        await self.async_restore()
+        await self.async_set_push_mode()
+        await self.async_set_journal()
+        self.schedule_update()
+        self.config_entry.async_on_unload(self.config_entry.add_update_listener(self.async_options_updated))
+        self.config_entry.async_on_unload(async_track_time_interval(
+            self.hass, self._tick_history, datetime.timedelta(seconds = HISTORY_TICK_INTERVAL)
+        ))
 
-        for domain in ['switch']:
+        for domain in PLATFORMS:
             self.hass.async_create_task(
                 self.hass.config_entries.async_forward_entry_setup(self.config_entry, domain)
             )
 
+        self.hass.async_create_task(self.async_update())
+        self.ensure_catalog()
+
         return True
 
-    def set_scan_interval(self) -> None:
-        async def refresh(event_time):
-            await self.async_update()
+    @property
+    def base_interval(self) -> float:
+        if self._is_subscribed:
+            return max(self.scan_interval, RECONCILE_INTERVAL)
+
+        return self.scan_interval
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    def schedule_update(self, delay: Optional[float] = None) -> None:
+        async def refresh(event_time) -> None:
+            self.unsub_timer = None
+
+            try:
+                if self._is_connected:
+                    await self.async_update()
+                else:
+                    await self.async_reconnect()
+            except Exception as e:
+                self._is_block = False
+
+                _LOGGER.error('Systemd Manager (%s): refresh failed: %r', self.host, e)
+            finally:
+                self.schedule_update(
+                    self._get_next_interval() if self._is_connected else self._get_reconnect_interval()
+                )
 
         if self.unsub_timer is not None:
             self.unsub_timer()
 
-        self.unsub_timer = async_track_time_interval(
-            self.hass, refresh, timedelta(seconds = self.scan_interval)
-        )
+        if self._is_unloaded:
+            return
+
+        if delay is None:
+            self._interval = self.base_interval
+            delay = self._interval
+
+        self._next_refresh = time.monotonic() + delay
+        self.unsub_timer = async_call_later(self.hass, delay, refresh)
+
+    @callback
+    def boost(self) -> None:
+        if self._is_subscribed or not self._is_connected:
+            return
+
+        self._fast_until = time.monotonic() + FAST_WINDOW
+
+        if self.unsub_timer is not None and self._next_refresh - time.monotonic() > FAST_SCAN_INTERVAL:
+            self.schedule_update(FAST_SCAN_INTERVAL)
+
+    def _get_next_interval(self) -> float:
+        histogram = self._metrics.get("refresh")
+        duration = histogram.last if histogram is not None else 0
+
+        now = time.monotonic()
+        if self._is_changed and not self._is_subscribed:
+            self._fast_until = now + FAST_WINDOW
+
+        if now < self._fast_until:
+            self._interval = self.base_interval
+
+            return max(FAST_SCAN_INTERVAL, duration)
+
+        interval = self._interval
+        self._interval = min(self._interval * BACKOFF_FACTOR, self.base_interval * MAX_BACKOFF)
+
+        return max(interval, duration)
+
+    def _get_reconnect_interval(self) -> float:
+        return min(RECONNECT_INTERVAL * BACKOFF_FACTOR ** self._reconnect_attempts, MAX_RECONNECT_INTERVAL)
 
     @staticmethod
     async def async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
-        hass.data[DOMAIN].set_scan_interval()
\ No newline at end of file
+        worker = hass.data[DOMAIN][entry.entry_id]
+
+        await worker.async_set_journal()
+
+        worker.notify([], True)
+
+        if not worker.is_connected:
+            return
+
+        await worker.async_set_push_mode()
+        worker.schedule_update()
+
+        await worker.async_update()
\ No newline at end of file
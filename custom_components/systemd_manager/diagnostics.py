@@ -0,0 +1,24 @@
+from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+
+from .core.const import DOMAIN
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, config_entry: ConfigEntry) -> dict:
+    worker = hass.data[DOMAIN][config_entry.entry_id]
+
+    return {
+        "options": dict(config_entry.options),
+        "is_connected": worker.is_connected,
+        "is_subscribed": worker.is_subscribed,
+        "interval": worker.interval,
+        "services": {
+            name: {
+                "available": service.is_available,
+                "on": service.is_on,
+                "history": worker.history.stats(name, service.unit_type.on_states),
+            }
+            for name, service in worker.services.list.items()
+        },
+        "refresh": worker.metrics.as_dict(),
+        "dbus": worker.manager.metrics.as_dict() if worker.manager is not None else {},
+    }
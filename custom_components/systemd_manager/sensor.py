@@ -0,0 +1,368 @@
+import logging
+
+from typing import Callable, Optional
+
+import homeassistant.helpers.entity_registry as er
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import PERCENTAGE
+from homeassistant.util import slugify
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .core.const import (
+    DOMAIN,
+    DATA_UPDATED,
+    METRICS_UPDATED,
+    RESOURCES_UPDATED,
+    HISTORY_UPDATED,
+    HISTORY_TICK,
+    ATTR_CPU,
+    ATTR_MEMORY,
+    ATTR_TASKS,
+    ATTR_IO_READ,
+    ATTR_IO_WRITE,
+    ATTR_UPTIME,
+    ATTR_RESTARTS,
+    ATTR_FAILURES,
+    ATTR_MTTR
+)
+from .core.service import Service
+from .core.worker import Worker
+
+_LOGGER = logging.getLogger(__name__)
+
+def _milliseconds(value: Optional[float]) -> Optional[float]:
+    return round(value * 1000, 2) if value is not None else None
+
+def _dbus_calls(worker: Worker) -> int:
+    return sum(histogram.count for histogram in worker.manager.metrics.histograms.values())
+
+def _dbus_errors(worker: Worker) -> int:
+    return sum(histogram.errors for histogram in worker.manager.metrics.histograms.values())
+
+def _dbus_attributes(worker: Worker) -> dict:
+    return {
+        member: {
+            "count": histogram.count,
+            "errors": histogram.errors,
+            "p50_ms": _milliseconds(histogram.percentile(50)),
+            "p95_ms": _milliseconds(histogram.percentile(95)),
+        }
+        for member, histogram in worker.manager.metrics.histograms.items()
+    }
+
+def _histogram_value(name: str) -> Callable:
+    def value(worker: Worker) -> Optional[float]:
+        histogram = worker.metrics.get(name)
+
+        return _milliseconds(histogram.last) if histogram is not None else None
+
+    return value
+
+def _histogram_attributes(name: str) -> Callable:
+    def attributes(worker: Worker) -> dict:
+        histogram = worker.metrics.get(name)
+        if histogram is None:
+            return {}
+
+        return {
+            "count": histogram.count,
+            "p50_ms": _milliseconds(histogram.percentile(50)),
+            "p95_ms": _milliseconds(histogram.percentile(95)),
+            "p99_ms": _milliseconds(histogram.percentile(99)),
+            "max_ms": _milliseconds(histogram.max),
+        }
+
+    return attributes
+
+def _counter_value(name: str) -> Callable:
+    return lambda worker: worker.metrics.counters.get(name, 0)
+
+SENSORS = {
+    "dbus_calls": ("D-Bus calls", None, _dbus_calls, _dbus_attributes),
+    "dbus_errors": ("D-Bus errors", None, _dbus_errors, None),
+    "refresh_duration": ("Refresh duration", "ms", _histogram_value("refresh"), _histogram_attributes("refresh")),
+    "refresh_loop_time": (
+        "Refresh event loop time", "ms", _histogram_value("refresh_loop"), _histogram_attributes("refresh_loop")
+    ),
+    "refresh_overruns": ("Refresh overruns", None, _counter_value("overruns"), None),
+    "refresh_skipped": ("Refresh skipped", None, _counter_value("skipped"), None),
+    "dbus_disconnects": ("D-Bus disconnects", None, _counter_value("disconnects"), None),
+    "dbus_reconnects": ("D-Bus reconnects", None, _counter_value("reconnects"), None),
+}
+
+RESOURCE_SENSORS = {
+    ATTR_CPU: ("CPU", PERCENTAGE, "mdi:cpu-64-bit", lambda value: value),
+    ATTR_MEMORY: ("Memory", "MiB", "mdi:memory", lambda value: round(value / 1048576, 2)),
+    ATTR_TASKS: ("Tasks", None, "mdi:format-list-numbered", lambda value: value),
+    ATTR_IO_READ: ("IO read", "B/s", "mdi:harddisk", lambda value: round(value)),
+    ATTR_IO_WRITE: ("IO write", "B/s", "mdi:harddisk", lambda value: round(value)),
+}
+
+HISTORY_SENSORS = {
+    ATTR_UPTIME: ("Uptime", PERCENTAGE, "mdi:percent"),
+    ATTR_RESTARTS: ("Restarts", None, "mdi:restart"),
+    ATTR_MTTR: ("MTTR", "s", "mdi:timer-wrench-outline"),
+}
+
+async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities) -> None:
+    worker = hass.data[DOMAIN][config_entry.entry_id]
+
+    async_add_entities([SystemdMetricSensor(hass, worker, key) for key in SENSORS])
+
+    resource_entities = {}
+    history_entities = {}
+
+    @callback
+    def update_entities(entities: dict, is_enabled: bool, create: Callable) -> list:
+        registry = er.async_get(hass)
+
+        for name in [name for name in entities if not is_enabled or not worker.services.has(name)]:
+            for entity in entities.pop(name):
+                if registry.async_get(entity.entity_id) is not None:
+                    registry.async_remove(entity.entity_id)
+                else:
+                    hass.async_create_task(entity.async_remove())
+
+        if not is_enabled:
+            return []
+
+        new_entities = []
+        for name, service in worker.services.list.items():
+            if name in entities:
+                continue
+
+            entities[name] = create(service)
+            new_entities += entities[name]
+
+        return new_entities
+
+    @callback
+    def update_services() -> None:
+        new_entities = update_entities(
+            resource_entities,
+            worker.resources,
+            lambda service: [
+                SystemdResourceSensor(hass, worker, service, key) for key in RESOURCE_SENSORS
+            ] if service.unit_type.has_cgroup else []
+        ) + update_entities(
+            history_entities,
+            worker.history_sensors,
+            lambda service: [SystemdHistorySensor(hass, worker, service, key) for key in HISTORY_SENSORS]
+        )
+
+        if len(new_entities) > 0:
+            async_add_entities(new_entities)
+
+    config_entry.async_on_unload(async_dispatcher_connect(
+        hass, DATA_UPDATED.format(config_entry.entry_id), update_services
+    ))
+
+    update_services()
+
+class SystemdMetricSensor(SensorEntity):
+    def __init__(self, hass: HomeAssistant, worker: Worker, key: str) -> None:
+        self.hass = hass
+        self.worker = worker
+
+        self._name, self._unit, self._value_fn, self._attributes_fn = SENSORS[key]
+        self._unique_id = "systemd_manager_{}".format(
+            key if not worker.address else slugify("{} {}".format(worker.host, key))
+        )
+        self._state = None
+
+        self.entity_id = "sensor.{}".format(self._unique_id)
+
+    @property
+    def name(self) -> str:
+        if self.worker.address:
+            return "Systemd Manager {} {}".format(self.worker.host, self._name)
+
+        return "Systemd Manager {}".format(self._name)
+
+    @property
+    def unique_id(self) -> str:
+        return self._unique_id
+
+    @property
+    def icon(self) -> str:
+        return 'mdi:chart-bell-curve'
+
+    @property
+    def entity_category(self) -> EntityCategory:
+        return EntityCategory.DIAGNOSTIC
+
+    @property
+    def native_unit_of_measurement(self) -> Optional[str]:
+        return self._unit
+
+    @property
+    def native_value(self):
+        return self._state[0] if self._state is not None else None
+
+    @property
+    def extra_state_attributes(self) -> Optional[dict]:
+        return self._state[1] if self._state is not None else None
+
+    @property
+    def should_poll(self) -> bool:
+        return False
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass, METRICS_UPDATED.format(self.worker.config_entry.entry_id), self._update
+        ))
+
+        self._state = self._get_state()
+
+    def _get_state(self) -> Optional[tuple]:
+        if self.worker.manager is None:
+            return None
+
+        return (
+            self._value_fn(self.worker),
+            self._attributes_fn(self.worker) if self._attributes_fn is not None else None
+        )
+
+    @callback
+    def _update(self) -> None:
+        state = self._get_state()
+
+        if state != self._state:
+            self._state = state
+            self.async_write_ha_state()
+
+class SystemdResourceSensor(SensorEntity):
+    def __init__(self, hass: HomeAssistant, worker: Worker, service: Service, key: str) -> None:
+        self.hass = hass
+        self.worker = worker
+        self.service = service
+
+        self._key = key
+        self._name, self._unit, self._icon, self._convert = RESOURCE_SENSORS[key]
+        self._unique_id = "systemd_manager_{}".format(slugify(
+            "{} {}".format(service.name, key) if not worker.address else "{} {} {}".format(worker.host, service.name, key)
+        ))
+        self._value = None
+        self._is_available = service.is_available
+
+        self.entity_id = "sensor.{}".format(self._unique_id)
+
+    @property
+    def name(self) -> str:
+        return "{} {}".format(self.service.name, self._name)
+
+    @property
+    def unique_id(self) -> str:
+        return self._unique_id
+
+    @property
+    def icon(self) -> str:
+        return self._icon
+
+    @property
+    def available(self) -> bool:
+        return self._is_available
+
+    @property
+    def native_unit_of_measurement(self) -> Optional[str]:
+        return self._unit
+
+    @property
+    def native_value(self):
+        return self._value
+
+    @property
+    def should_poll(self) -> bool:
+        return False
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass, RESOURCES_UPDATED.format(self.worker.config_entry.entry_id), self._update
+        ))
+
+        self._value = self._get_value()
+
+    def _get_value(self):
+        value = self.service.resources.get(self._key)
+
+        return self._convert(value) if value is not None else None
+
+    @callback
+    def _update(self) -> None:
+        value = self._get_value()
+
+        if value != self._value or self._is_available != self.service.is_available:
+            self._value = value
+            self._is_available = self.service.is_available
+            self.async_write_ha_state()
+
+class SystemdHistorySensor(SensorEntity):
+    def __init__(self, hass: HomeAssistant, worker: Worker, service: Service, key: str) -> None:
+        self.hass = hass
+        self.worker = worker
+        self.service = service
+
+        self._key = key
+        self._name, self._unit, self._icon = HISTORY_SENSORS[key]
+        self._unique_id = "systemd_manager_{}".format(slugify(
+            "{} {}".format(service.name, key) if not worker.address else "{} {} {}".format(worker.host, service.name, key)
+        ))
+        self._stats = {}
+
+        self.entity_id = "sensor.{}".format(self._unique_id)
+
+    @property
+    def name(self) -> str:
+        return "{} {}".format(self.service.name, self._name)
+
+    @property
+    def unique_id(self) -> str:
+        return self._unique_id
+
+    @property
+    def icon(self) -> str:
+        return self._icon
+
+    @property
+    def native_unit_of_measurement(self) -> Optional[str]:
+        return self._unit
+
+    @property
+    def native_value(self):
+        return self._stats.get(self._key)
+
+    @property
+    def extra_state_attributes(self) -> Optional[dict]:
+        if self._key != ATTR_RESTARTS:
+            return None
+
+        return {ATTR_FAILURES: self._stats.get(ATTR_FAILURES)}
+
+    @property
+    def should_poll(self) -> bool:
+        return False
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass, HISTORY_UPDATED.format(self.worker.config_entry.entry_id, self.service.name), self._update
+        ))
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass, HISTORY_TICK.format(self.worker.config_entry.entry_id), self._update
+        ))
+
+        self._stats = self._get_stats()
+
+    def _get_stats(self) -> dict:
+        return self.worker.history.stats(self.service.name, self.service.unit_type.on_states)
+
+    @callback
+    def _update(self) -> None:
+        stats = self._get_stats()
+
+        if stats != self._stats:
+            self._stats = stats
+            self.async_write_ha_state()
@@ -1,6 +1,7 @@
 import logging
 
 import homeassistant.helpers.device_registry as dr
+import homeassistant.helpers.entity_registry as er
 
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.util import slugify
@@ -8,16 +9,31 @@ from homeassistant.components.switch import ENTITY_ID_FORMAT, SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
-from .core.const import DOMAIN, DATA_UPDATED
+from .core.const import DOMAIN, DATA_UPDATED, SERVICE_UPDATED, UNRECORDED_ATTRIBUTES
 from .core.service import Service
+from .core.worker import Worker
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities) -> None:
-    worker = hass.data[DOMAIN]
+    worker = hass.data[DOMAIN][config_entry.entry_id]
+
+    entities = {}
 
     @callback
     def update_services() -> None:
+        registry = er.async_get(hass)
+
+        for name in [name for name in entities if not worker.services.has(name)]:
+            entity = entities.pop(name)
+
+            _LOGGER.debug("Systemd Manager remove {}".format(name))
+
+            if registry.async_get(entity.entity_id) is not None:
+                registry.async_remove(entity.entity_id)
+            else:
+                hass.async_create_task(entity.async_remove())
+
         if len(worker.services.list) == 0:
             return
 
@@ -31,26 +47,32 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, asyn
 
             _LOGGER.debug("Systemd Manager update {}".format(name))
 
-            new_services.append(SystemdSwitch(hass, service))
+            entities[name] = SystemdSwitch(hass, worker, service)
+            new_services.append(entities[name])
 
         if len(new_services) > 0:
             async_add_entities(new_services)
 
-    async_dispatcher_connect(
-        hass, DATA_UPDATED, update_services
-    )
+    config_entry.async_on_unload(async_dispatcher_connect(
+        hass, DATA_UPDATED.format(config_entry.entry_id), update_services
+    ))
+
+    update_services()
 
 class SystemdSwitch(SwitchEntity):
-    def __init__(self, hass: HomeAssistant, service: Service) -> None:
+    _unrecorded_attributes = UNRECORDED_ATTRIBUTES
+
+    def __init__(self, hass: HomeAssistant, worker: Worker, service: Service) -> None:
         self.hass = hass
+        self.worker = worker
         self.service = service
-        self.unsub_update = None
 
-        self._unique_id = "systemd_ " + ENTITY_ID_FORMAT.format(slugify(service.name.lower()))
+        self._unique_id = "systemd_ " + ENTITY_ID_FORMAT.format(
+            slugify(service.name.lower() if not worker.address else "{} {}".format(worker.host, service.name).lower())
+        )
         self._name = self.service.name
         self._is_available = self.service.is_available
         self._is_on = self.service.is_on
-        self._extra = self.service.extra
 
         self.entity_id = f"{DOMAIN}.{self._unique_id}"
 
@@ -76,41 +98,33 @@ class SystemdSwitch(SwitchEntity):
 
     @property
     def extra_state_attributes(self) -> dict:
-        return self._extra
+        return self.service.extra
 
     @property
     def should_poll(self) -> bool:
         return False
 
     async def async_added_to_hass(self) -> None:
-        self.unsub_update = async_dispatcher_connect(
-            self.hass, DATA_UPDATED, self._schedule_immediate_update
-        )
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass, SERVICE_UPDATED.format(self.worker.config_entry.entry_id, self.service.name), self._schedule_immediate_update
+        ))
 
     @callback
     def _schedule_immediate_update(self) -> None:
-        if (
-            self._is_available != self.service.is_available
-            or self._is_on != self.service.is_on
-            or self._extra != self.service.extra
-        ):
-            self.async_schedule_update_ha_state(True)
-
-    async def will_remove_from_hass(self) -> None:
-        if self.unsub_update:
-            self.unsub_update()
-
-        self.unsub_update = None
+        self.async_schedule_update_ha_state(True)
 
     async def async_update(self) -> None:
         self._is_available = self.service.is_available
         self._is_on = self.service.is_on
-        self._extra = self.service.extra
 
     async def async_turn_on(self, **kwargs) -> None:
         await self.service.update_state('wait-on', True)
         await self.service.start()
 
+        self.worker.boost()
+
     async def async_turn_off(self, **kwargs) -> None:
         await self.service.update_state('wait-off', True)
         await self.service.stop()
+
+        self.worker.boost()
@@ -0,0 +1,92 @@
+import voluptuous as vol
+import homeassistant.helpers.config_validation as cv
+import homeassistant.helpers.entity_registry as er
+
+from typing import Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.components import websocket_api
+
+from .core.const import DOMAIN, CONF_LINES, MAX_JOURNAL_SIZE, ATTR_UNIT_NAME
+from .core.journal import Journal
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    websocket_api.async_register_command(hass, websocket_journal)
+    websocket_api.async_register_command(hass, websocket_journal_subscribe)
+    websocket_api.async_register_command(hass, websocket_graph)
+
+@callback
+def _get_journal(hass: HomeAssistant, entity_id: str) -> tuple:
+    state = hass.states.get(entity_id)
+    entry = er.async_get(hass).async_get(entity_id)
+    if not state or not entry or entry.config_entry_id not in hass.data.get(DOMAIN, {}):
+        return None, None
+
+    journal: Optional[Journal] = hass.data[DOMAIN][entry.config_entry_id].journal
+    unit_name = state.attributes.get(ATTR_UNIT_NAME)
+
+    if journal is None or not journal.has(unit_name):
+        return None, None
+
+    return journal, unit_name
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "systemd_manager/graph",
+    vol.Required("entity_id"): cv.entity_id,
+})
+@websocket_api.async_response
+async def websocket_graph(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict) -> None:
+    entry = er.async_get(hass).async_get(msg["entity_id"])
+    if not entry or entry.config_entry_id not in hass.data.get(DOMAIN, {}):
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Entity is not found")
+
+        return
+
+    graph = await hass.data[DOMAIN][entry.config_entry_id].async_ensure_graph()
+
+    connection.send_result(msg["id"], {"units": graph.as_dict()})
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "systemd_manager/journal",
+    vol.Required("entity_id"): cv.entity_id,
+    vol.Optional(CONF_LINES): vol.All(vol.Coerce(int), vol.Range(min = 1, max = MAX_JOURNAL_SIZE)),
+})
+@callback
+def websocket_journal(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict) -> None:
+    journal, unit_name = _get_journal(hass, msg["entity_id"])
+
+    if journal is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Journal is not available")
+
+        return
+
+    connection.send_result(msg["id"], {
+        ATTR_UNIT_NAME: unit_name,
+        CONF_LINES: journal.get(unit_name, msg.get(CONF_LINES))
+    })
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "systemd_manager/journal/subscribe",
+    vol.Required("entity_id"): cv.entity_id,
+    vol.Optional(CONF_LINES): vol.All(vol.Coerce(int), vol.Range(min = 1, max = MAX_JOURNAL_SIZE)),
+})
+@callback
+def websocket_journal_subscribe(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict) -> None:
+    journal, unit_name = _get_journal(hass, msg["entity_id"])
+
+    if journal is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Journal is not available")
+
+        return
+
+    @callback
+    def forward(entry: dict) -> None:
+        connection.send_message(websocket_api.event_message(msg["id"], {CONF_LINES: [entry]}))
+
+    connection.subscriptions[msg["id"]] = journal.async_subscribe(unit_name, forward)
+    connection.send_result(msg["id"])
+    connection.send_message(websocket_api.event_message(msg["id"], {
+        ATTR_UNIT_NAME: unit_name,
+        CONF_LINES: journal.get(unit_name, msg.get(CONF_LINES))
+    }))